@@ -1,9 +1,12 @@
 """
 自动更新检查器 — 静默在后台运行，有新版本时弹窗提示
 """
-import urllib.request
+import os
+import re
 import json
-from PyQt6.QtCore import QThread, pyqtSignal, QTimer
+from functools import lru_cache
+import requests
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, QTimer
 
 try:
     from version import APP_VERSION
@@ -11,35 +14,76 @@ except ImportError:
     APP_VERSION = "1.0.21"  # fallback
 GITHUB_RELEASES_API = "https://api.github.com/repos/secure-artifacts/google_tongbu/releases/latest"
 CHECK_INTERVAL_HOURS = 6   # 每 6 小时静默检查一次
+_VERSION_RE = re.compile(r"v?(\d+(?:\.\d+)*)")
+ETAG_CACHE_FILE = "config/update_check.json"  # 缓存上次响应的 ETag 与版本信息
 
+# 模块级会话：同一进程内多次检查复用到 api.github.com 的 TLS 连接
+_session = requests.Session()
 
+
+@lru_cache(maxsize=32)
 def _parse_version(tag: str) -> tuple:
-    """把 'v1.2.3' 或 '1.2.3' 解析成可比较的元组 (1, 2, 3)"""
-    tag = tag.lstrip("v").strip()
-    try:
-        return tuple(int(x) for x in tag.split("."))
-    except Exception:
+    """把 'v1.2.3' / '1.2.3' / 'v1.2.3-rc1' 解析成可比较的元组 (1, 2, 3)"""
+    match = _VERSION_RE.match(tag.strip())
+    if not match:
         return (0,)
+    return tuple(int(x) for x in match.group(1).split("."))
 
 
-class UpdateCheckWorker(QThread):
-    """后台检查 GitHub Releases 是否有新版本"""
+class UpdateCheckSignals(QObject):
+    """UpdateCheckWorker 的信号桥（QRunnable 本身不能发信号）"""
 
     update_available = pyqtSignal(str, str, str)  # tag, name, body
     check_failed     = pyqtSignal(str)             # error message
 
-    def __init__(self, current_version: str = APP_VERSION):
+
+class UpdateCheckWorker(QRunnable):
+    """后台检查 GitHub Releases 是否有新版本（在 QThreadPool 中运行）"""
+
+    def __init__(self, current_version: str = APP_VERSION,
+                 signals: UpdateCheckSignals = None):
         super().__init__()
         self.current_version = current_version
+        self._current_parsed = _parse_version(current_version)
+        self.signals = signals or UpdateCheckSignals()
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(ETAG_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_cache(self, etag: str, data: dict):
+        try:
+            os.makedirs(os.path.dirname(ETAG_CACHE_FILE), exist_ok=True)
+            with open(ETAG_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "etag": etag,
+                    "tag_name": data.get("tag_name", ""),
+                    "name": data.get("name"),
+                    "body": data.get("body"),
+                }, f, ensure_ascii=False)
+        except Exception:
+            pass
 
     def run(self):
         try:
-            req = urllib.request.Request(
-                GITHUB_RELEASES_API,
-                headers={"User-Agent": f"GDriveSync/{self.current_version}"},
-            )
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode())
+            cache = self._load_cache()
+            headers = {"User-Agent": f"GDriveSync/{self.current_version}"}
+            if cache.get("etag"):
+                headers["If-None-Match"] = cache["etag"]
+
+            resp = _session.get(GITHUB_RELEASES_API, headers=headers, timeout=10)
+            if resp.status_code == 304:
+                # 未变化：GitHub 返回空响应体，沿用缓存的版本信息
+                data = cache
+            else:
+                resp.raise_for_status()
+                data = resp.json()
+                etag = resp.headers.get("ETag")
+                if etag:
+                    self._save_cache(etag, data)
 
             latest_tag  = data.get("tag_name", "")
             latest_name = data.get("name", latest_tag)
@@ -48,10 +92,14 @@ class UpdateCheckWorker(QThread):
             if not latest_tag:
                 return
 
-            if _parse_version(latest_tag) > _parse_version(self.current_version):
-                self.update_available.emit(latest_tag, latest_name, latest_body)
+            # 快速路径：标签与当前版本相同，无需解析比较
+            if latest_tag.lstrip("v") == self.current_version.lstrip("v"):
+                return
+
+            if _parse_version(latest_tag) > self._current_parsed:
+                self.signals.update_available.emit(latest_tag, latest_name, latest_body)
         except Exception as e:
-            self.check_failed.emit(str(e))
+            self.signals.check_failed.emit(str(e))
 
 
 class AutoUpdater:
@@ -62,7 +110,11 @@ class AutoUpdater:
 
     def __init__(self, parent_window):
         self.parent = parent_window
-        self._workers = []
+
+        # 信号桥常驻主线程，线程池中的检查结果通过排队连接回到 UI 线程
+        self._signals = UpdateCheckSignals(parent_window)
+        self._signals.update_available.connect(self._on_update_available)
+        # check_failed 只是静默忽略（网络不好 / API 限频等情况）
 
         # 定时器（毫秒）
         self._timer = QTimer(parent_window)
@@ -74,13 +126,8 @@ class AutoUpdater:
         self._timer.start(CHECK_INTERVAL_HOURS * 3600 * 1000)        # 之后每 N 小时
 
     def _check(self):
-        worker = UpdateCheckWorker(APP_VERSION)
-        worker.update_available.connect(self._on_update_available)
-        # check_failed 只是静默忽略（网络不好 / API 限频等情况）
-        worker.start()
-        self._workers.append(worker)
-        # 清理已完成的 worker 引用
-        self._workers = [w for w in self._workers if w.isRunning()]
+        # 复用全局线程池，不再每次检查都新建 QThread
+        QThreadPool.globalInstance().start(UpdateCheckWorker(APP_VERSION, self._signals))
 
     def _on_update_available(self, tag: str, name: str, body: str):
         from PyQt6.QtWidgets import QMessageBox, QDialog, QVBoxLayout, QLabel, QTextEdit, QPushButton, QHBoxLayout
@@ -4,11 +4,17 @@
 import os
 import hashlib
 import time
-from typing import Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from itertools import islice
+from typing import Optional, Callable, Dict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from core.gdrive_client import GDriveClient, FileInfo
+from core.stat_backend import _CASE_INSENSITIVE
 from database.models import Database, DownloadProgress
 from utils.path_helpers import get_safe_path
+from utils.file_helpers import fadvise
+
+RECORD_BATCH_SIZE = 500  # 下载记录按批预先创建，每批一个事务
 
 
 class Downloader:
@@ -21,25 +27,83 @@ class Downloader:
         self.progress_model = DownloadProgress(db)
         self.thread_count = thread_count
         self.bandwidth_limit = bandwidth_limit  # KB/s, 0 表示不限制
-        self.is_paused = False
         self.is_stopped = False
+        
+        # 暂停控制：set 表示运行中，clear 表示暂停；resume 时立即唤醒所有线程
+        self._pause_event = threading.Event()
+        self._pause_event.set()
+        
+        # 令牌桶带宽控制（所有下载线程共享）
+        self._bucket_lock = threading.Lock()
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
     
-    def calculate_md5(self, file_path: str, chunk_size: int = 8192) -> str:
-        """计算文件MD5"""
-        md5 = hashlib.md5()
+    def _throttle(self, nbytes: int):
+        """令牌桶限速：按实际下载字节数等待，而不是固定休眠"""
+        if self.bandwidth_limit <= 0 or nbytes <= 0:
+            return
         
+        rate = self.bandwidth_limit * 1024  # bytes/s
+        with self._bucket_lock:
+            now = time.monotonic()
+            # 桶容量限制为 1 秒的配额，避免空闲后突发
+            self._tokens = min(rate, self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            self._tokens -= nbytes
+            wait_time = -self._tokens / rate if self._tokens < 0 else 0
+        
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    @staticmethod
+    def calculate_md5(file_path: str, chunk_size: int = 1 << 20) -> str:
+        """计算文件MD5（优先 hashlib.file_digest，否则 1MB 预分配缓冲区 + readinto）"""
         try:
-            with open(file_path, 'rb') as f:
+            # Python 3.11+：读取与哈希循环完全在 C 层执行
+            if hasattr(hashlib, 'file_digest'):
+                with open(file_path, 'rb', buffering=0) as f:
+                    fadvise(f, 'SEQUENTIAL')
+                    digest = hashlib.file_digest(f, 'md5').hexdigest()
+                    fadvise(f, 'DONTNEED')
+                    return digest
+
+            md5 = hashlib.md5()
+            buf = bytearray(chunk_size)
+            mv = memoryview(buf)
+
+            # 自行缓冲，关闭 Python 层缓冲
+            with open(file_path, 'rb', buffering=0) as f:
+                fadvise(f, 'SEQUENTIAL')
                 while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
+                    n = f.readinto(buf)
+                    if not n:
                         break
-                    md5.update(chunk)
+                    md5.update(mv[:n])
+                fadvise(f, 'DONTNEED')
             return md5.hexdigest()
         except Exception as e:
             print(f"MD5计算失败: {e}")
             return ""
     
+    def _hash_prefix(self, hasher, file_path: str, length: int,
+                     chunk_size: int = 1 << 20) -> bool:
+        """用文件前 length 字节初始化增量哈希，前缀不完整时返回 False"""
+        buf = bytearray(chunk_size)
+        mv = memoryview(buf)
+        remaining = length
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                fadvise(f, 'SEQUENTIAL')
+                while remaining > 0:
+                    n = f.readinto(mv[:min(chunk_size, remaining)])
+                    if not n:
+                        return False
+                    hasher.update(mv[:n])
+                    remaining -= n
+            return True
+        except OSError:
+            return False
+    
     def verify_file(self, file_path: str, expected_md5: str) -> bool:
         """验证文件完整性"""
         if not expected_md5:
@@ -50,7 +114,8 @@ class Downloader:
     
     def download_single_file(self, task_id: int, file_info: FileInfo, 
                             local_path: str,
-                            progress_callback: Optional[Callable[[int, int, str], None]] = None) -> bool:
+                            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                            record: Optional[Dict] = None) -> bool:
         """
         下载单个文件
         
@@ -59,6 +124,7 @@ class Downloader:
             file_info: 文件信息
             local_path: 本地保存路径
             progress_callback: 进度回调 (downloaded, total, filename)
+            record: 调用方已查询到的进度记录（批量下载时预先创建），为 None 时自行查询
         
         Returns:
             下载是否成功
@@ -71,7 +137,8 @@ class Downloader:
         print(f"MD5: {file_info.md5_checksum}")
         
         # 检查数据库中是否有进度记录
-        record = self.progress_model.get_by_file_id(task_id, file_info.id)
+        if record is None:
+            record = self.progress_model.get_by_file_id(task_id, file_info.id)
         
         if not record:
             print(f"创建新的下载记录...")
@@ -94,14 +161,20 @@ class Downloader:
             if record['status'] == 'completed':
                 if os.path.exists(local_path):
                     print(f"文件已完成，验证中...")
-                    # 验证文件
-                    if self.verify_file(local_path, file_info.md5_checksum):
+                    # 先比较大小（一次 stat），不符则无需读取整个文件计算 MD5
+                    # （Google Docs 导出文件没有 MD5 和大小，不做此检查）
+                    size_ok = (not file_info.md5_checksum
+                               or os.path.getsize(local_path) == file_info.size)
+                    if size_ok and self.verify_file(local_path, file_info.md5_checksum):
                         print(f"文件验证通过，跳过下载")
                         return True  # 已完成且验证通过
                 
                 print(f"文件损坏或不存在，重新下载")
                 # 文件损坏或不存在，重新下载
                 resume_from = 0
+            elif record['status'] == 'pending' and not record.get('downloaded_size'):
+                # 预先创建、尚未开始的记录：同名本地文件不是本次下载的片段，从头下载
+                resume_from = 0
             else:
                 # 从断点继续
                 resume_from = record.get('downloaded_size', 0)
@@ -114,39 +187,74 @@ class Downloader:
                     if actual_size != resume_from:
                         resume_from = actual_size
                         print(f"调整断点位置为: {resume_from} bytes")
+                else:
+                    # 大文件分段下载只写 .part，记录的进度是各段之和而不是连续前缀；
+                    # 本地文件不存在时不能续传，清掉残留的 .part 从头下载
+                    resume_from = 0
+                    part_path = local_path + '.part'
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    print("本地文件不存在，从头下载")
         
         # 下载文件
         try:
             print(f"开始下载，从 {resume_from} bytes 开始...")
             
+            last_downloaded = resume_from
+            progress_lock = threading.Lock()
+            
             def download_progress(downloaded, total):
-                # 更新数据库
-                self.progress_model.update_progress(
-                    record_id, 
-                    downloaded, 
-                    'downloading'
-                )
+                nonlocal last_downloaded
                 
-                # 回调
-                if progress_callback:
-                    progress_callback(downloaded, total, file_info.name)
+                # 分段下载时多个线程同时回调、到达顺序不定，分段重试还会让累计值回退：
+                # 在锁内计算增量，只报告单调不减的进度
+                with progress_lock:
+                    delta = downloaded - last_downloaded
+                    if delta <= 0:
+                        return
+                    last_downloaded = downloaded
+                    
+                    # 更新数据库（每前进 5MB 写一次，完成时必写）
+                    self.progress_model.update_progress_throttled(
+                        record_id, downloaded, force=downloaded >= total
+                    )
+                    
+                    # 回调
+                    if progress_callback:
+                        progress_callback(downloaded, total, file_info.name)
                 
-                # 带宽限制
-                if self.bandwidth_limit > 0:
-                    # 简单的带宽控制（可以改进）
-                    time.sleep(0.1)
+                # 带宽限制（在锁外等待，不阻塞其它分段）
+                self._throttle(delta)
+            
+            # 边下载边计算 MD5，省去下载完成后再读一遍文件
+            hasher = None
+            if file_info.md5_checksum:
+                hasher = hashlib.md5()
+                # 断点续传：先用已下载的前缀初始化哈希
+                if resume_from > 0 and not self._hash_prefix(hasher, local_path, resume_from):
+                    hasher = None  # 前缀不完整，退回下载后整体校验
             
             success = self.client.download_file(
                 file_id=file_info.id,
                 local_path=local_path,
                 resume_from=resume_from,
-                progress_callback=download_progress
+                progress_callback=download_progress,
+                hasher=hasher
             )
             
             if success:
                 print(f"下载完成，开始验证...")
                 # 验证文件
-                if self.verify_file(local_path, file_info.md5_checksum):
+                if not file_info.md5_checksum:
+                    # 云端未提供 MD5（Google Docs 导出等）：不读文件，依赖 HTTPS 完整性，
+                    # 已知大小时只核对字节数
+                    verified = file_info.size <= 0 or os.path.getsize(local_path) == file_info.size
+                elif hasher:
+                    verified = hasher.hexdigest().lower() == file_info.md5_checksum.lower()
+                else:
+                    verified = self.verify_file(local_path, file_info.md5_checksum)
+                
+                if verified:
                     print(f"✓ 文件验证通过")
                     self.progress_model.mark_completed(record_id)
                     return True
@@ -192,7 +300,76 @@ class Downloader:
         """
         stats = {'success': 0, 'failed': 0, 'skipped': 0}
         
-        def download_worker(file_info: FileInfo):
+        # 基路径前缀只拼接一次，之后每个文件直接字符串相加
+        base_prefix = os.path.join(base_local_path, '')
+        
+        # 目标目录 -> {文件名: 大小}，每个目录只 scandir 一次；
+        # 文件名大小写不敏感的平台（Windows/macOS）上以 casefold() 后的名称为键
+        dir_cache = {}
+        dir_cache_lock = threading.Lock()
+        
+        def existing_sizes(dir_path: str) -> dict:
+            with dir_cache_lock:
+                sizes = dir_cache.get(dir_path)
+                if sizes is None:
+                    sizes = {}
+                    try:
+                        with os.scandir(dir_path) as it:
+                            for entry in it:
+                                if entry.is_file():
+                                    name = entry.name.casefold() if _CASE_INSENSITIVE else entry.name
+                                    sizes[name] = entry.stat().st_size
+                    except OSError:
+                        pass  # 目录不存在
+                    dir_cache[dir_path] = sizes
+                return sizes
+        
+        def prepared_files():
+            """
+            按批准备待下载文件：跳过本地已存在的文件，并为其余文件批量创建下载记录
+            
+            每批只查询一次、插入一次，避免每个文件各自开连接、提交。
+            """
+            file_iter = iter(files)
+            while True:
+                chunk = list(islice(file_iter, RECORD_BATCH_SIZE))
+                if not chunk:
+                    return
+                
+                to_download = []
+                for file_info in chunk:
+                    # 构建本地路径
+                    local_path = get_safe_path(base_prefix + file_info.path)
+                    
+                    # 检查是否已存在（查目录缓存，不再逐个 stat）
+                    dir_path, file_name = os.path.split(local_path)
+                    if _CASE_INSENSITIVE:
+                        file_name = file_name.casefold()
+                    if existing_sizes(dir_path).get(file_name) == file_info.size:
+                        # 文件已存在且大小相同，跳过
+                        if file_callback:
+                            file_callback(file_info.name, 'skipped')
+                        stats['skipped'] += 1
+                        continue
+                    to_download.append((file_info, local_path))
+                
+                file_ids = [file_info.id for file_info, _ in to_download]
+                records = self.progress_model.get_by_file_ids(task_id, file_ids)
+                missing = [
+                    (task_id, file_info.id, file_info.path, local_path,
+                     file_info.size, file_info.md5_checksum or "")
+                    for file_info, local_path in to_download if file_info.id not in records
+                ]
+                if missing:
+                    self.progress_model.create_many(missing)
+                    records.update(self.progress_model.get_by_file_ids(
+                        task_id, [row[1] for row in missing]
+                    ))
+                
+                for file_info, local_path in to_download:
+                    yield file_info, local_path, records.get(file_info.id)
+        
+        def download_worker(file_info: FileInfo, local_path: str, record: Optional[Dict]):
             """下载工作线程"""
             # 检查停止标志
             if stop_flag and stop_flag():
@@ -201,25 +378,13 @@ class Downloader:
             if self.is_stopped:
                 return 'stopped'
             
-            while self.is_paused:
-                time.sleep(0.5)
-            
-            # 构建本地路径
-            local_path = get_safe_path(os.path.join(base_local_path, file_info.path))
-            
-            # 检查是否已存在
-            if os.path.exists(local_path):
-                # 检查大小和修改时间
-                local_size = os.path.getsize(local_path)
-                if local_size == file_info.size:
-                    # 文件已存在且大小相同，跳过
-                    if file_callback:
-                        file_callback(file_info.name, 'skipped')
-                    return 'skipped'
+            self._pause_event.wait()
+            if self.is_stopped:
+                return 'stopped'
             
             # 下载
             success = self.download_single_file(
-                task_id, file_info, local_path, progress_callback
+                task_id, file_info, local_path, progress_callback, record
             )
             
             if success:
@@ -231,36 +396,63 @@ class Downloader:
                     file_callback(file_info.name, 'failed')
                 return 'failed'
         
-        # 使用线程池下载
+        # 使用线程池流水线下载：只保留有限个在途任务，完成一个再提交一个，
+        # 避免为成千上万个文件一次性创建 Future，停止时也无需逐个取消
+        max_in_flight = self.thread_count * 2
+        file_iter = prepared_files()
+        
         with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
-            futures = {executor.submit(download_worker, f): f for f in files}
+            pending = set()
+            
+            def fill():
+                while len(pending) < max_in_flight:
+                    item = next(file_iter, None)
+                    if item is None:
+                        return
+                    pending.add(executor.submit(download_worker, *item))
             
-            for future in as_completed(futures):
+            fill()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    result = future.result()
+                    if result == 'success':
+                        stats['success'] += 1
+                    elif result == 'failed':
+                        stats['failed'] += 1
+                    elif result == 'skipped':
+                        stats['skipped'] += 1
+                
                 # 检查停止标志
                 if stop_flag and stop_flag():
                     # 取消所有待执行的任务
-                    for f in futures:
+                    for f in pending:
                         f.cancel()
                     break
                 
-                result = future.result()
-                if result == 'success':
-                    stats['success'] += 1
-                elif result == 'failed':
-                    stats['failed'] += 1
-                elif result == 'skipped':
-                    stats['skipped'] += 1
+                fill()
+        
+        # 排队中的进度落盘，并结束后台写入线程
+        self.progress_model.flush()
         
         return stats
     
+    @property
+    def is_paused(self) -> bool:
+        """是否处于暂停状态"""
+        return not self._pause_event.is_set()
+    
     def pause(self):
         """暂停下载"""
-        self.is_paused = True
+        self._pause_event.clear()
     
     def resume(self):
         """恢复下载"""
-        self.is_paused = False
+        self._pause_event.set()
     
     def stop(self):
         """停止下载"""
         self.is_stopped = True
+        # 唤醒暂停中的线程，让它们看到停止标志后退出
+        self._pause_event.set()
@@ -4,33 +4,84 @@ Google Drive API 客户端
 """
 import os
 import pickle
-from typing import List, Dict, Optional, Callable
+import shutil
+import time
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Callable, Tuple
 from google.auth.transport.requests import Request, AuthorizedSession
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
 import io
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote
 from utils.path_helpers import get_safe_path
+from utils.file_helpers import preallocate, fadvise
 
 
 # Google Drive API 权限范围
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
+# 下载会话连接池大小（需不小于下载线程数，否则多余线程会反复重建连接）
+HTTP_POOL_MAXSIZE = 16
+
+# 大文件分段并发下载：超过阈值的文件拆成多个 Range 请求并行下载
+PARALLEL_DOWNLOAD_THRESHOLD = 32 * 1024 * 1024  # 32MB
+PARALLEL_SEGMENT_SIZE = 16 * 1024 * 1024        # 每段 16MB
+PARALLEL_SEGMENT_WORKERS = 8
+
+# 递归扫描时并发列出子文件夹的线程数
+LIST_WORKERS = 8
+
+# 合并查询时每次最多包含的父文件夹数（查询串长度限制）
+MULTI_LIST_MAX_PARENTS = 50
+
+DRIVE_FILES_API = 'https://www.googleapis.com/drive/v3/files'
+LIST_FIELDS = "nextPageToken, files(id, name, mimeType, size, modifiedTime, md5Checksum, parents)"
+
+
+class RangeNotSupported(Exception):
+    """服务器（或中间代理/重定向）未按 Range 请求返回 206 分段内容"""
+
+
+def _parse_drive_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    解析 Drive 返回的 RFC 3339 时间（如 2024-01-02T03:04:05.678Z），
+    返回去掉时区信息的 UTC 时间；格式不符时返回 None，由调用方退回通用解析
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
 
 class FileInfo:
     """文件信息类"""
     
+    # 全量扫描可能产生十万级实例，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = ('id', 'name', 'mime_type', 'size', 'modified_time',
+                 'md5_checksum', 'parents', 'path', 'name_lower', 'ext', 'modified_dt')
+    
     def __init__(self, file_dict: Dict):
         self.id = file_dict.get('id')
         self.name = file_dict.get('name')
         self.mime_type = file_dict.get('mimeType')
         self.size = int(file_dict.get('size', 0))
         self.modified_time = file_dict.get('modifiedTime')
+        self.modified_dt = _parse_drive_time(self.modified_time)  # 对比时使用的已解析时间
         self.md5_checksum = file_dict.get('md5Checksum')
         self.parents = file_dict.get('parents', [])
         self.path = ""  # 完整路径，需要后续构建
+        # 过滤时使用的小写文件名与扩展名，构造时算一次
+        self.name_lower = (self.name or '').lower()
+        self.ext = os.path.splitext(self.name_lower)[1]
     
     def is_folder(self) -> bool:
         """判断是否为文件夹"""
@@ -49,6 +100,8 @@ class GDriveClient:
         self.token_path = token_path
         self.service = None
         self.creds = None
+        self.session = None  # 认证线程的授权会话，同时作为"已认证"标记
+        self._tls = threading.local()  # 每个线程独立的授权会话，避免共享连接状态
     
     def authenticate(self) -> bool:
         """
@@ -87,8 +140,43 @@ class GDriveClient:
         # 构建服务 - 使用 credentials 参数会自动处理 HTTP 层
         # 这比手动配置 httplib2 更稳定
         self.service = build('drive', 'v3', credentials=self.creds, static_discovery=False)
+        
+        # 创建授权会话并复用，避免每个文件都重新进行 TCP+TLS 握手
+        self._tls = threading.local()
+        self.session = self._new_session()
+        self._tls.session = self.session
         return True
     
+    def _new_session(self) -> AuthorizedSession:
+        """创建一个挂载了连接池与重试策略的授权会话（共享同一份凭据）"""
+        session = AuthorizedSession(self.creds)
+        session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            # 仅在建立连接/收到限流或 5xx 时自动重试；流式读取中断由 download_file 自行处理
+            max_retries=Retry(
+                total=3, connect=3, read=0, backoff_factor=1,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False
+            )
+        ))
+        return session
+    
+    @property
+    def _session(self) -> AuthorizedSession:
+        """
+        当前线程的授权会话（首次访问时惰性创建）
+        
+        下载/扫描在线程池中并发执行，每个线程持有自己的会话与连接，
+        线程内仍然复用 keep-alive 连接。
+        """
+        session = getattr(self._tls, 'session', None)
+        if session is None:
+            session = self._new_session()
+            self._tls.session = session
+        return session
+    
     def get_user_info(self) -> Dict:
         """获取当前授权用户信息"""
         if not self.service:
@@ -107,19 +195,115 @@ class GDriveClient:
         Returns:
             文件信息列表
         """
-        if not self.service:
+        if not self.session:
+            raise Exception("未认证，请先调用 authenticate()")
+        
+        # 与扫描线程共用带连接池的授权会话，可在任意线程调用
+        return self._list_children(folder_id)
+    
+    def list_folder_contents_multi(self, folder_ids: List[str]) -> Dict[str, List[FileInfo]]:
+        """
+        一次查询列出多个文件夹的内容（仅一层），按父文件夹分组返回
+        
+        用 ('A' in parents or 'B' in parents ...) 合并查询，N 个文件夹只需一次往返（加翻页）。
+        调用方每批不宜超过 MULTI_LIST_MAX_PARENTS 个文件夹。
+        
+        Args:
+            folder_ids: 文件夹ID列表（可含 'root'）
+        
+        Returns:
+            {folder_id: 文件信息列表}，每个请求的文件夹都有对应项
+        """
+        if not self.session:
             raise Exception("未认证，请先调用 authenticate()")
         
-        query = f"'{folder_id}' in parents and trashed=false"
-        fields = "files(id, name, mimeType, size, modifiedTime, md5Checksum, parents)"
+        result = {folder_id: [] for folder_id in folder_ids}
+        if len(folder_ids) == 1:
+            result[folder_ids[0]] = self._list_children(folder_ids[0])
+            return result
+        
+        parents_query = ' or '.join(f"'{folder_id}' in parents" for folder_id in folder_ids)
+        params = {
+            'q': f"({parents_query}) and trashed=false",
+            'fields': LIST_FIELDS,
+            'pageSize': 1000,
+        }
+        # 返回的 parents 是真实ID，'root' 别名无法直接匹配：不属于其它请求文件夹的条目归入根目录
+        has_root = 'root' in result
+        while True:
+            response = self._session.get(DRIVE_FILES_API, params=params, timeout=30)
+            response.raise_for_status()
+            results = response.json()
+            for f in results.get('files', []):
+                item = FileInfo(f)
+                matched = False
+                for parent_id in item.parents:
+                    bucket = result.get(parent_id)
+                    if bucket is not None:
+                        bucket.append(item)
+                        matched = True
+                if not matched and has_root:
+                    result['root'].append(item)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+            params['pageToken'] = page_token
+        
+        return result
+    
+    def list_subtree(self, folder_id: str = 'root', max_depth: int = 4) -> Dict[str, List[FileInfo]]:
+        """
+        逐层列出整个子树（最多 max_depth 层），用于一次性展开全部
+        
+        每层的文件夹按 MULTI_LIST_MAX_PARENTS 个一批合并查询，
+        请求次数约为 层数 × ceil(该层文件夹数 / 批大小)，而不是每个文件夹一次。
+        
+        Args:
+            folder_id: 子树根文件夹ID
+            max_depth: 最多列出的层数（第 max_depth 层的文件夹本身不再列出）
+        
+        Returns:
+            {folder_id: 文件信息列表}，包含根及所有已列出的子文件夹
+        """
+        result = {}
+        level = [folder_id]
+        for _ in range(max_depth):
+            next_level = []
+            for start in range(0, len(level), MULTI_LIST_MAX_PARENTS):
+                groups = self.list_folder_contents_multi(level[start:start + MULTI_LIST_MAX_PARENTS])
+                result.update(groups)
+                for items in groups.values():
+                    next_level.extend(item.id for item in items
+                                      if item.is_folder() and item.id not in result)
+            if not next_level:
+                break
+            # 同一文件夹可能有多个父目录，去重
+            level = list(dict.fromkeys(next_level))
+        return result
+    
+    def _list_children(self, folder_id: str) -> List[FileInfo]:
+        """
+        通过共享的授权会话列出文件夹内容（仅一层，自动翻页）
         
-        results = self.service.files().list(
-            q=query,
-            fields=fields,
-            pageSize=1000
-        ).execute()
+        googleapiclient 的 service 底层 httplib2 不是线程安全的，
+        并发扫描时改走当前线程的 requests 会话，同时复用 keep-alive 连接。
+        """
+        params = {
+            'q': f"'{folder_id}' in parents and trashed=false",
+            'fields': LIST_FIELDS,
+            'pageSize': 1000,
+        }
+        files = []
+        while True:
+            response = self._session.get(DRIVE_FILES_API, params=params, timeout=30)
+            response.raise_for_status()
+            results = response.json()
+            files.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+            params['pageToken'] = page_token
         
-        files = results.get('files', [])
         return [FileInfo(f) for f in files]
     
     def list_files_recursive(self, folder_id: str = 'root', 
@@ -137,33 +321,63 @@ class GDriveClient:
             所有文件信息列表
         """
         all_files = []
-        items = self.list_folder_contents(folder_id)
+        for batch in self.iter_files_recursive(folder_id, current_path, progress_callback):
+            all_files.extend(batch)
+        return all_files
+    
+    def iter_files_recursive(self, folder_id: str = 'root', 
+                             current_path: str = "",
+                             progress_callback: Optional[Callable[[str], None]] = None) -> Iterator[List[FileInfo]]:
+        """
+        递归列出文件夹内所有文件，每列完一个文件夹就产出其中的文件（同一批文件位于同一目录）
         
-        for item in items:
-            item_path = os.path.join(current_path, item.name) if current_path else item.name
-            item.path = item_path
-            
-            if progress_callback:
-                progress_callback(f"扫描: {item_path}")
-            
-            if item.is_folder():
-                # 递归获取子文件夹内容
-                sub_files = self.list_files_recursive(
-                    item.id, 
-                    item_path, 
-                    progress_callback
-                )
-                all_files.extend(sub_files)
-            else:
-                # 只添加文件，不添加文件夹
-                all_files.append(item)
+        按层并发列出子文件夹（LIST_WORKERS 个线程），每层的请求同时发出，
+        扫描耗时从“文件夹数 × 往返延迟”降到约“层数 × 往返延迟”；
+        调用方处理已产出的批次时，本层其余文件夹的请求仍在后台进行。
         
-        return all_files
+        Args:
+            folder_id: 起始文件夹ID
+            current_path: 当前路径（用于构建完整路径）
+            progress_callback: 进度回调函数
+        
+        Yields:
+            一个文件夹下的文件列表（不含子文件夹）
+        """
+        if not self.session:
+            raise Exception("未认证，请先调用 authenticate()")
+        
+        level = [(folder_id, current_path)]
+        
+        with ThreadPoolExecutor(max_workers=LIST_WORKERS) as executor:
+            while level:
+                results = executor.map(lambda entry: self._list_children(entry[0]), level)
+                next_level = []
+                
+                for (_, parent_path), items in zip(level, results):
+                    files = []
+                    for item in items:
+                        item_path = os.path.join(parent_path, item.name) if parent_path else item.name
+                        item.path = item_path
+                        
+                        if progress_callback:
+                            progress_callback(f"扫描: {item_path}")
+                        
+                        if item.is_folder():
+                            # 子文件夹留到下一层并发处理
+                            next_level.append((item.id, item_path))
+                        else:
+                            # 只添加文件，不添加文件夹
+                            files.append(item)
+                    if files:
+                        yield files
+                
+                level = next_level
     
     def download_file(self, file_id: str, local_path: str, 
                      chunk_size: int = 10 * 1024 * 1024,  # 10MB chunks
                      resume_from: int = 0,
-                     progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     hasher=None) -> bool:
         """
         下载文件（支持断点续传）
         
@@ -173,11 +387,13 @@ class GDriveClient:
             chunk_size: 分块大小（字节）
             resume_from: 从哪个字节开始下载（断点续传）
             progress_callback: 进度回调 callback(downloaded, total)
+            hasher: 可选的 hashlib 对象，写入的同时增量计算哈希
+                    （断点续传时调用方需先用已有前缀初始化）
         
         Returns:
             下载是否成功
         """
-        if not self.service:
+        if not self.session:
             raise Exception("未认证，请先调用 authenticate()")
         
         try:
@@ -186,12 +402,18 @@ class GDriveClient:
             # 确保目录存在
             os.makedirs(os.path.dirname(local_path), exist_ok=True)
             
+            # 当前线程的授权会话（连接保持；service 的 httplib2 不能跨线程共享）
+            session = self._session
+            
             print(f"[GDrive] 获取文件元数据: {file_id}")
-            # 获取文件元数据
-            file_metadata = self.service.files().get(
-                fileId=file_id, 
-                fields='size, md5Checksum, mimeType, name'
-            ).execute()
+            # 获取文件元数据（直接走 REST 接口）
+            response = session.get(
+                f'{DRIVE_FILES_API}/{file_id}',
+                params={'fields': 'size,md5Checksum,mimeType,name'},
+                timeout=30
+            )
+            response.raise_for_status()
+            file_metadata = response.json()
             
             total_size = int(file_metadata.get('size', 0))
             mime_type = file_metadata.get('mimeType', '')
@@ -201,18 +423,24 @@ class GDriveClient:
             # Google Docs 类型需要导出
             if 'google-apps' in mime_type:
                 print(f"[GDrive] 检测到 Google Docs 文件，执行导出...")
-                return self._export_google_doc(file_id, local_path, mime_type, progress_callback)
+                return self._export_google_doc(file_id, local_path, mime_type, progress_callback, chunk_size)
             
             # 使用 requests 库进行下载（更稳定的 SSL 支持）
             print(f"[GDrive] 使用 requests 库下载...")
             
-            # 创建授权会话
-            from google.auth.transport.requests import AuthorizedSession
-            session = AuthorizedSession(self.creds)
-            
             # 构建下载 URL
             download_url = f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
             
+            # 大文件（且非断点续传）使用分段并发下载，突破单连接限速
+            if resume_from == 0 and total_size > PARALLEL_DOWNLOAD_THRESHOLD:
+                try:
+                    return self._download_ranges(
+                        session, download_url, local_path, total_size, progress_callback, hasher
+                    )
+                except RangeNotSupported as e:
+                    # 分段写入的 .part 已删除，改用单连接整体下载
+                    print(f"[GDrive] 分段下载不可用，改为单连接下载: {e}")
+            
             # 设置请求头支持断点续传
             headers = {}
             if resume_from > 0:
@@ -230,28 +458,41 @@ class GDriveClient:
             
             while retry_count <= max_retries:
                 try:
-                    # 发起请求
-                    response = session.get(download_url, headers=headers, stream=True, timeout=30)
-                    response.raise_for_status()
-                    
-                    # 写入文件
-                    with open(local_path, mode) as f:
-                        for chunk in response.iter_content(chunk_size=chunk_size):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                
-                                if progress_callback and total_size > 0:
-                                    progress_callback(downloaded, total_size)
-                                
-                                if downloaded % (chunk_size * 10) == 0:  # 每10个块打印一次
-                                    progress_pct = (downloaded / total_size * 100) if total_size > 0 else 0
-                                    print(f"[GDrive] 下载进度: {progress_pct:.1f}% ({downloaded}/{total_size} bytes)")
+                    # 发起请求（with 保证异常时连接归还连接池）
+                    with session.get(download_url, headers=headers, stream=True, timeout=30) as response:
+                        response.raise_for_status()
+                        response.raw.decode_content = True
+                        
+                        with open(local_path, mode) as f:
+                            if not progress_callback and not hasher:
+                                # 无需进度与哈希：整个复制循环在 C 层完成
+                                shutil.copyfileobj(response.raw, f, length=chunk_size)
+                            else:
+                                # 写入文件：读入预分配缓冲区，避免每块新建 bytes 对象
+                                buf = bytearray(chunk_size)
+                                mv = memoryview(buf)
+                                while True:
+                                    n = response.raw.readinto(buf)
+                                    if not n:
+                                        break
+                                    chunk = mv[:n]
+                                    f.write(chunk)
+                                    if hasher:
+                                        hasher.update(chunk)
+                                    downloaded += n
+                                    
+                                    if progress_callback and total_size > 0:
+                                        progress_callback(downloaded, total_size)
+                                    
+                                    if downloaded % (chunk_size * 10) == 0:  # 每10个块打印一次
+                                        progress_pct = (downloaded / total_size * 100) if total_size > 0 else 0
+                                        print(f"[GDrive] 下载进度: {progress_pct:.1f}% ({downloaded}/{total_size} bytes)")
                     
                     print(f"[GDrive] ✓ 下载完成")
                     return True
-                    
-                except requests.exceptions.RequestException as e:
+                
+                except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                    # 直接读 response.raw 时，连接中断抛出的是 urllib3 异常
                     retry_count += 1
                     print(f"[GDrive] 下载失败 (重试 {retry_count}/{max_retries}): {e}")
                     
@@ -272,15 +513,123 @@ class GDriveClient:
                         mode = 'ab'
             
             return False
-            
+        
         except Exception as e:
             print(f"[GDrive] ✗ 下载失败: {e}")
             import traceback
             traceback.print_exc()
             return False
     
+    def _download_ranges(self, session, download_url: str, local_path: str, total_size: int,
+                         progress_callback: Optional[Callable[[int, int], None]] = None,
+                         hasher=None, max_retries: int = 3) -> bool:
+        """
+        分段并发下载大文件
+        
+        先写入 .part 临时文件并预分配大小，各段按偏移写入，全部完成后再重命名，
+        避免中断时留下大小正确但内容不完整的文件被误判为已下载。
+        各段乱序到达，无法边写边算哈希，因此 hasher 在全部完成后顺序读取一次。
+        """
+        part_path = local_path + '.part'
+        segments = [
+            (lo, min(lo + PARALLEL_SEGMENT_SIZE, total_size) - 1)
+            for lo in range(0, total_size, PARALLEL_SEGMENT_SIZE)
+        ]
+        print(f"[GDrive] 分段并发下载: {len(segments)} 段, {PARALLEL_SEGMENT_WORKERS} 线程")
+        
+        with open(part_path, 'wb') as f:
+            preallocate(f, total_size)
+        
+        lock = threading.Lock()
+        downloaded = 0
+        
+        def fetch_segment(lo: int, hi: int):
+            nonlocal downloaded
+            retry_count = 0
+            expected = hi - lo + 1
+            while True:
+                written = 0
+                try:
+                    with session.get(
+                        download_url, headers={'Range': f'bytes={lo}-{hi}'},
+                        stream=True, timeout=30
+                    ) as response:
+                        response.raise_for_status()
+                        # 必须确认返回的正是请求的这一段：若返回 200 整个文件，
+                        # 从 lo 开始写入会覆盖其它已完成的分段
+                        content_range = response.headers.get('Content-Range', '')
+                        if (response.status_code != 206
+                                or not content_range.startswith(f'bytes {lo}-{hi}/')):
+                            raise RangeNotSupported(
+                                f"分段 {lo}-{hi} 返回 {response.status_code} {content_range or '无 Content-Range'}"
+                            )
+                        response.raw.decode_content = True
+                        buf = bytearray(1024 * 1024)
+                        mv = memoryview(buf)
+                        # 每个线程独立的文件句柄，按偏移写入
+                        with open(part_path, 'r+b') as f:
+                            f.seek(lo)
+                            # 最多写满本段长度，多出的内容绝不写进后面的分段
+                            while written < expected:
+                                n = response.raw.readinto(mv[:min(len(buf), expected - written)])
+                                if not n:
+                                    break
+                                f.write(mv[:n])
+                                written += n
+                                with lock:
+                                    downloaded += n
+                                    current = downloaded
+                                if progress_callback:
+                                    progress_callback(current, total_size)
+                    if written != expected:
+                        raise requests.exceptions.ContentDecodingError(
+                            f"分段 {lo}-{hi} 长度不符: {written}"
+                        )
+                    return
+                except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+                    with lock:
+                        downloaded -= written
+                    retry_count += 1
+                    print(f"[GDrive] 分段 {lo}-{hi} 失败 (重试 {retry_count}/{max_retries}): {e}")
+                    if retry_count > max_retries:
+                        raise
+                    # 指数退避
+                    time.sleep(2 ** retry_count)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=PARALLEL_SEGMENT_WORKERS) as executor:
+                futures = [executor.submit(fetch_segment, lo, hi) for lo, hi in segments]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception:
+                        # 取消尚未开始的分段
+                        for f in futures:
+                            f.cancel()
+                        raise
+            if hasher:
+                buf = bytearray(1024 * 1024)
+                mv = memoryview(buf)
+                with open(part_path, 'rb', buffering=0) as f:
+                    fadvise(f, 'SEQUENTIAL')
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        hasher.update(mv[:n])
+                    # 已读完，释放页缓存，避免大文件挤占内存
+                    fadvise(f, 'DONTNEED')
+            os.replace(part_path, local_path)
+            print("[GDrive] ✓ 分段下载完成")
+            return True
+        except Exception:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+    
     def _export_google_doc(self, file_id: str, local_path: str, mime_type: str,
-                          progress_callback: Optional[Callable] = None) -> bool:
+                          progress_callback: Optional[Callable] = None,
+                          chunk_size: int = 10 * 1024 * 1024) -> bool:
         """导出 Google Docs 文件"""
         try:
             # 根据类型选择导出格式
@@ -292,16 +641,28 @@ class GDriveClient:
             
             export_mime = export_formats.get(mime_type, 'application/pdf')
             
-            request = self.service.files().export_media(fileId=file_id, mimeType=export_mime)
-            
-            local_path = get_safe_path(local_path)
-            with open(local_path, 'wb') as fh:
-                downloader = MediaIoBaseDownload(fh, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-                    if status and progress_callback:
-                        progress_callback(int(status.progress() * 100), 100)
+            # 与普通下载共用授权会话，流式读取 10MB 分块（不再经过 MediaIoBaseDownload）
+            export_url = f'{DRIVE_FILES_API}/{file_id}/export?mimeType={quote(export_mime)}'
+            with self._session.get(export_url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                
+                # 导出内容通常没有 Content-Length，此时不报告进度
+                total_size = int(response.headers.get('Content-Length') or 0)
+                downloaded = 0
+                
+                response.raw.decode_content = True
+                buf = bytearray(chunk_size)
+                mv = memoryview(buf)
+                local_path = get_safe_path(local_path)
+                with open(local_path, 'wb') as fh:
+                    while True:
+                        n = response.raw.readinto(buf)
+                        if not n:
+                            break
+                        fh.write(mv[:n])
+                        downloaded += n
+                        if progress_callback and total_size > 0:
+                            progress_callback(downloaded, total_size)
             
             return True
         except Exception as e:
@@ -310,34 +671,57 @@ class GDriveClient:
     
     def get_file_metadata(self, file_id: str) -> Dict:
         """获取文件元数据"""
-        if not self.service:
+        if not self.session:
             raise Exception("未认证，请先调用 authenticate()")
         
-        return self.service.files().get(
-            fileId=file_id,
-            fields='id, name, mimeType, size, modifiedTime, md5Checksum, parents'
-        ).execute()
+        response = self._session.get(f"{DRIVE_FILES_API}/{file_id}", params={
+            'fields': 'id, name, mimeType, size, modifiedTime, md5Checksum, parents',
+        }, timeout=30)
+        response.raise_for_status()
+        return response.json()
     
     def search_folders(self, query: str) -> List[FileInfo]:
         """
-        搜索文件夹
+        搜索文件夹（由 Drive 服务端按名称匹配，只返回命中的文件夹）
+        
+        通过当前线程的授权会话请求，可在界面的线程池中调用。
         
         Args:
             query: 搜索关键词
         
         Returns:
-            匹配的文件夹列表
+            匹配的文件夹列表（第一页，最多 100 个）
         """
-        if not self.service:
+        return self.search_folders_page(query)[0]
+    
+    def search_folders_page(self, query: str, page_token: Optional[str] = None) -> Tuple[List[FileInfo], Optional[str]]:
+        """
+        按页搜索文件夹，供界面滚动到底部时再取下一页
+        
+        Args:
+            query: 搜索关键词
+            page_token: 上一页返回的令牌，None 表示第一页
+        
+        Returns:
+            (本页匹配的文件夹列表, 下一页令牌；没有更多结果时为 None)
+        """
+        if not self.session:
             raise Exception("未认证，请先调用 authenticate()")
         
-        search_query = f"mimeType='application/vnd.google-apps.folder' and name contains '{query}' and trashed=false"
+        # 查询字符串中的反斜杠和单引号需要转义
+        escaped = query.replace('\\', '\\\\').replace("'", "\\'")
+        search_query = f"mimeType='application/vnd.google-apps.folder' and name contains '{escaped}' and trashed=false"
         
-        results = self.service.files().list(
-            q=search_query,
-            fields='files(id, name, mimeType, parents)',
-            pageSize=100
-        ).execute()
+        params = {
+            'q': search_query,
+            'fields': 'nextPageToken, files(id, name, mimeType, parents)',
+            'pageSize': 100,
+            'spaces': 'drive',
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        response = self._session.get(DRIVE_FILES_API, params=params, timeout=30)
+        response.raise_for_status()
         
-        files = results.get('files', [])
-        return [FileInfo(f) for f in files]
+        results = response.json()
+        return [FileInfo(f) for f in results.get('files', [])], results.get('nextPageToken')
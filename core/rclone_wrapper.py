@@ -2,13 +2,59 @@
 Rclone Wrapper - Interface to rclone.exe for stable cloud syncing
 """
 import os
+import re
+import atexit
+import base64
+import itertools
+import queue
+import secrets
+import selectors
+import socket
 import subprocess
+import tempfile
 import json
+import threading
 import time
-from typing import Optional, Callable, Dict, List
+import requests
+from typing import Optional, Callable, Dict, Iterator, List, Tuple
 from dataclasses import dataclass
 from utils.path_helpers import get_safe_path
 
+# 统计日志每秒一条，优先使用更快的 orjson 解码
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# 从 rclone.conf 中提取 token = {...}
+_TOKEN_RE = re.compile(r'token\s*=\s*(\{[^}]+\})')
+
+# 一次扫描同时判断 JSON 日志行是否值得解码并给出类别（match.lastgroup）：
+# stats 统计 / error 错误 / copied 复制完成 / skipped 未变化跳过
+_LOG_SCAN = re.compile(
+    rb'(?P<stats>"stats"\s*:)|(?P<error>"level"\s*:\s*"error")'
+    rb'|"msg"\s*:\s*"(?:(?P<copied>Copied)|(?P<skipped>Unchanged skipping))'
+)
+
+# 直接写入 rclone.conf 时使用的 Drive 远程配置模板（INI 格式）
+_RCLONE_CONFIG_TEMPLATE = "[{name}]\ntype = drive\nscope = drive\ntoken = {token}\n"
+_RCLONE_CREDS_TEMPLATE = "client_id = {client_id}\nclient_secret = {client_secret}\n"
+
+TEST_REMOTE_CACHE_TTL = 60  # 远程连接测试结果缓存秒数（配置文件未变时）
+
+RCD_START_TIMEOUT = 5  # 等待 rclone rcd 守护进程就绪的最长秒数
+
+# 每个统计周期最多转换的正在传输文件数（界面只显示前 10 行）
+TRANSFERRING_LIMIT = 64
+
+# 回调节流：统计每 0.1 秒拉取一次，但只有距上次回调满 0.2 秒或新增 5MB 时才回调界面；
+# 文件事件攒批后以 "batch" 类型一次性回调
+PROGRESS_POLL_INTERVAL = 0.1
+PROGRESS_MIN_INTERVAL = 0.2
+PROGRESS_MIN_BYTES = 5 * 1024 * 1024
+EVENT_BATCH_SIZE = 32
+EVENT_FLUSH_INTERVAL = 0.1
+
 
 @dataclass
 class RcloneStats:
@@ -22,7 +68,150 @@ class RcloneStats:
     transfers_complete: int
     elapsed_time: float
     total_files: int = 0  # 总文件数
-    transferring: List[Dict[str, str]] = None  # 当前正在传输的文件列表
+    transferring: Tuple[Dict[str, str], ...] = ()  # 当前正在传输的文件（不可变快照）
+
+
+def _free_port() -> int:
+    """找一个本机空闲端口，交给 rclone 的远程控制接口监听"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _drain_lines(stream, out_queue: queue.Queue, read_size: int = 65536):
+    """
+    后台读取线程：按 64KB 块读取子进程输出，切分出完整的行后整批放入队列
+    
+    每次系统调用处理多行，避免逐行 readline 的开销；读到 EOF 时放入 None。
+    """
+    fd = stream.fileno()
+    pending = b''
+    try:
+        while True:
+            data = os.read(fd, read_size)
+            if not data:
+                break
+            *lines, pending = (pending + data).split(b'\n')
+            if lines:
+                out_queue.put(lines)
+        if pending:
+            out_queue.put([pending])
+    except OSError:
+        pass  # 进程被终止、管道关闭
+    finally:
+        out_queue.put(None)
+
+
+class _PipeLines:
+    """
+    按块读取子进程输出并切出完整的行
+    
+    POSIX 上由 selectors 等待管道可读后直接在调用线程读取，不需要额外的读取线程；
+    Windows 的匿名管道不支持 select，仍由 _drain_lines 后台线程读取后经队列交付。
+    """
+    
+    def __init__(self, stream, read_size: int = 65536):
+        self._fd = stream.fileno()
+        self._read_size = read_size
+        self._pending = b''
+        self._done = False
+        self._queue = None
+        self._selector = None
+        if os.name == 'nt':
+            self._queue = queue.Queue()
+            threading.Thread(target=_drain_lines, args=(stream, self._queue, read_size), daemon=True).start()
+        else:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._fd, selectors.EVENT_READ)
+    
+    def get(self, timeout: float):
+        """等待最多 timeout 秒，返回这段时间内读到的完整行（可能为空列表）；输出结束后返回 None"""
+        if self._queue is not None:
+            try:
+                return self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return []
+        if self._done:
+            return None
+        if not self._selector.select(timeout):
+            return []
+        try:
+            data = os.read(self._fd, self._read_size)
+        except OSError:
+            data = b''  # 进程被终止、管道关闭
+        if not data:
+            self.close()
+            pending, self._pending = self._pending, b''
+            return [pending] if pending else None
+        *lines, self._pending = (self._pending + data).split(b'\n')
+        return lines
+    
+    def close(self):
+        self._done = True
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+
+# 单位表：(除数, 单位, 小数位)，下标为 bit_length 按 10 位分档
+_SIZE_UNITS = (
+    (1, 'B', 0),
+    (1 << 10, 'KB', 1),
+    (1 << 20, 'MB', 1),
+    (1 << 30, 'GB', 2),
+)
+
+
+def _format_size(size_bytes: float) -> str:
+    """字节数转为可读字符串（用于传输列表显示，每个统计周期每个文件调用两次）"""
+    index = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    divisor, unit, digits = _SIZE_UNITS[max(index, 0)]
+    return f"{size_bytes / divisor:.{digits}f} {unit}"
+
+
+def _transfer_row(item: Dict) -> Dict[str, str]:
+    """将一个正在传输的文件条目转换为界面显示用的字符串字段"""
+    size = item.get('size') or 0
+    speed = item.get('speed') or 0
+    eta = item.get('eta')
+    return {
+        'name': item.get('name', ''),
+        'percentage': f"{item.get('percentage', 0)}%",
+        'size': _format_size(size) if size > 0 else '-',
+        'speed': f"{_format_size(speed)}/s" if speed > 0 else '-',
+        'eta': f"{eta}s" if eta is not None else '-',
+        'status': "传输中" if item.get('bytes') else "准备传输"
+    }
+
+
+def _stats_key(data: Dict) -> Dict:
+    """统计内容的比较键：去掉每次都会变化的耗时字段"""
+    return {k: v for k, v in data.items() if k not in ('elapsedTime', 'transferTime')}
+
+
+def _stats_from_json(data: Dict) -> RcloneStats:
+    """
+    将 --use-json-log 输出的 stats 字段转换为 RcloneStats
+    
+    字节数、速度、ETA 均已是数值，无需再按单位字符串解析。
+    """
+    active = data.get('transferring') or ()
+    transferring = tuple(
+        _transfer_row(item) for item in itertools.islice(active, TRANSFERRING_LIMIT)
+    )
+    
+    return RcloneStats(
+        bytes_transferred=data.get('bytes') or 0,
+        total_bytes=data.get('totalBytes') or 0,
+        speed=data.get('speed') or 0,
+        eta=data.get('eta') or 0,
+        errors=data.get('errors') or 0,
+        transfers_active=len(active),
+        transfers_complete=data.get('transfers') or 0,
+        elapsed_time=data.get('elapsedTime') or 0,
+        total_files=data.get('totalTransfers') or 0,
+        transferring=transferring
+    )
 
 
 class RcloneWrapper:
@@ -57,6 +246,25 @@ class RcloneWrapper:
         self.process = None
         self.is_paused = False
         
+        # 结果缓存：避免每次刷新界面都重新启动 rclone 进程
+        self._version_cache: Optional[str] = None
+        self._user_info_cache: Optional[Tuple[int, Dict[str, str]]] = None  # (配置 mtime_ns, 结果)
+        self._test_remote_cache: Dict[str, Tuple[int, float, bool]] = {}  # 远程名 -> (配置 mtime_ns, 时间, 结果)
+        self._quota_cache: Dict[str, Tuple[int, Dict[str, int]]] = {}  # 远程名 -> (配置 mtime_ns, about 返回的配额)
+        
+        # 常驻的 rclone rcd 守护进程（首次使用时启动），短操作改走本地 HTTP 调用
+        self._rcd_proc = None
+        self._rcd_url = None
+        self._rcd_config_mtime_ns = 0
+        self._rcd_lock = threading.Lock()
+        self._rc_session = requests.Session()
+        # 远程控制接口只监听 127.0.0.1，但本机其他进程/浏览器页面同样能访问，
+        # 每个实例生成随机账号密码，守护进程和同步进程的 --rc 共用
+        self._rc_user = secrets.token_urlsafe(16)
+        self._rc_pass = secrets.token_urlsafe(32)
+        self._rc_session.auth = (self._rc_user, self._rc_pass)
+        atexit.register(self.shutdown_daemon)
+        
         # 验证rclone存在并尝试自动下载
         if not self._ensure_rclone_exists(download_callback):
             print(f"[Warning] Rclone未找到且无法自动下载: {self.rclone_path}")
@@ -65,6 +273,7 @@ class RcloneWrapper:
         
         # 确保配置目录存在
         os.makedirs(os.path.dirname(self.config_path) if os.path.dirname(self.config_path) else "config", exist_ok=True)
+        self._config_dir_ready = True
         
     def _ensure_rclone_exists(self, download_callback=None) -> bool:
         """确保 rclone 存在，如果不存在则自动下载"""
@@ -147,8 +356,115 @@ class RcloneWrapper:
             print(f"[Rclone] 自动下载失败: {e}")
             return False
     
+    def _config_mtime_ns(self) -> int:
+        """配置文件的修改时间（纳秒），用作缓存键；文件不存在时返回 0"""
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return 0
+    
+    def _ensure_rcd(self) -> bool:
+        """
+        启动（或复用）rclone rcd 守护进程
+        
+        每次启动 rclone.exe 在 Windows 上要 50-150ms，常驻一个守护进程后，
+        连接测试等短操作只是一次本地 HTTP 请求。
+        
+        Returns:
+            守护进程是否可用
+        """
+        with self._rcd_lock:
+            if self._rcd_proc and self._rcd_proc.poll() is None:
+                # 配置文件变化（重新授权）后清空 rclone 内部的远程缓存，使新 token 生效
+                mtime_ns = self._config_mtime_ns()
+                if mtime_ns != self._rcd_config_mtime_ns:
+                    self._rcd_config_mtime_ns = mtime_ns
+                    try:
+                        self._rc_session.post(f"{self._rcd_url}fscache/clear", json={}, timeout=3)
+                    except requests.RequestException:
+                        pass
+                return True
+            
+            try:
+                # 先找一个空闲端口再交给 rclone 监听
+                port = _free_port()
+                
+                kwargs = {}
+                if os.name == 'nt':
+                    kwargs['creationflags'] = 0x08000000 # CREATE_NO_WINDOW
+                # 账号密码走环境变量，命令行参数在进程列表中对本机所有用户可见
+                kwargs['env'] = {**os.environ, "RCLONE_RC_USER": self._rc_user, "RCLONE_RC_PASS": self._rc_pass}
+                
+                self._rcd_config_mtime_ns = self._config_mtime_ns()
+                self._rcd_proc = subprocess.Popen(
+                    [
+                        self.rclone_path, "rcd",
+                        "--rc-addr", f"127.0.0.1:{port}",
+                        "--config", self.config_path,
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    **kwargs
+                )
+                self._rcd_url = f"http://127.0.0.1:{port}/"
+                
+                # 等待守护进程就绪
+                deadline = time.monotonic() + RCD_START_TIMEOUT
+                while time.monotonic() < deadline:
+                    if self._rcd_proc.poll() is not None:
+                        break
+                    try:
+                        self._rc_session.post(f"{self._rcd_url}rc/noop", json={}, timeout=1)
+                        print(f"[Rclone] rcd 守护进程已启动: {self._rcd_url}")
+                        return True
+                    except requests.ConnectionError:
+                        time.sleep(0.05)
+            except Exception as e:
+                print(f"[Rclone] 启动 rcd 守护进程失败: {e}")
+            
+            self._stop_rcd_locked()
+            return False
+    
+    def _rc(self, command: str, timeout: float = 10, **params) -> Dict:
+        """调用 rcd 守护进程的远程控制命令（如 operations/about），失败时抛出异常"""
+        response = self._rc_session.post(f"{self._rcd_url}{command}", json=params, timeout=timeout)
+        if response.status_code != 200:
+            try:
+                error = response.json().get('error', response.text)
+            except ValueError:
+                error = response.text
+            raise RuntimeError(error)
+        return _json_loads(response.content)
+    
+    def _stop_rcd_locked(self):
+        """结束 rcd 守护进程（调用方需持有 _rcd_lock）"""
+        proc, self._rcd_proc = self._rcd_proc, None
+        self._rcd_url = None
+        if proc and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+    
+    def shutdown_daemon(self):
+        """关闭 rcd 守护进程（程序退出时自动调用）"""
+        with self._rcd_lock:
+            self._stop_rcd_locked()
+    
     def get_version(self) -> str:
-        """获取rclone版本"""
+        """获取rclone版本（成功结果在进程内缓存）"""
+        if self._version_cache:
+            return self._version_cache
+        
+        # 守护进程已在运行时直接查询，免去再启动一个进程
+        if self._rcd_proc and self._rcd_proc.poll() is None:
+            try:
+                self._version_cache = f"rclone {self._rc('core/version', timeout=3)['version']}"
+                return self._version_cache
+            except Exception:
+                pass
         try:
             kwargs = {}
             if os.name == 'nt':
@@ -161,10 +477,48 @@ class RcloneWrapper:
                 timeout=5,
                 **kwargs
             )
-            return result.stdout.split('\n')[0] if result.returncode == 0 else "Unknown"
+            if result.returncode != 0:
+                return "Unknown"
+            self._version_cache = result.stdout.split('\n')[0]
+            return self._version_cache
         except Exception as e:
             return f"Error: {e}"
     
+    @staticmethod
+    def build_drive_config(token_json: str, remote_name: str = "gdrive",
+                           client_id: str = "", client_secret: str = "") -> str:
+        """
+        生成 Drive 远程的 rclone.conf 内容
+        
+        Args:
+            token_json: OAuth token 的 JSON 字符串
+            remote_name: 远程名称
+            client_id: 可选的 OAuth Client ID（与 client_secret 同时提供才写入）
+            client_secret: 可选的 OAuth Client Secret
+        """
+        parts = [_RCLONE_CONFIG_TEMPLATE.format_map({'name': remote_name, 'token': token_json})]
+        if client_id and client_secret:
+            parts.append(_RCLONE_CREDS_TEMPLATE.format_map(
+                {'client_id': client_id, 'client_secret': client_secret}
+            ))
+        return ''.join(parts)
+    
+    def write_config(self, config_content: str):
+        """
+        直接写入 rclone.conf（一次系统调用）
+        
+        文件包含 token，仅允许当前用户读写（0o600）。
+        """
+        if not self._config_dir_ready:
+            os.makedirs(os.path.dirname(self.config_path) or "config", exist_ok=True)
+            self._config_dir_ready = True
+        fd = os.open(self.config_path,
+                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o600)
+        try:
+            os.write(fd, config_content.encode('utf-8'))
+        finally:
+            os.close(fd)
+    
     def setup_remote(self, remote_name: str, app_id: str, app_key: str, auth_data: str) -> bool:
         """
         手动设置一个新的Rclone远程连接（主要是为了向下兼容）
@@ -182,7 +536,8 @@ class RcloneWrapper:
             import subprocess
             import os
             
-            os.makedirs(os.path.dirname(self.config_path) if os.path.dirname(self.config_path) else ".", exist_ok=True)
+            if not self._config_dir_ready:
+                os.makedirs(os.path.dirname(self.config_path) if os.path.dirname(self.config_path) else ".", exist_ok=True)
             
             cmd = [
                 self.rclone_path, 
@@ -249,7 +604,8 @@ class RcloneWrapper:
             
             import subprocess
             import os
-            os.makedirs(os.path.dirname(self.config_path) if os.path.dirname(self.config_path) else ".", exist_ok=True)
+            if not self._config_dir_ready:
+                os.makedirs(os.path.dirname(self.config_path) if os.path.dirname(self.config_path) else ".", exist_ok=True)
             
             cmd = [
                 self.rclone_path, 
@@ -285,7 +641,10 @@ class RcloneWrapper:
     
     def get_user_info(self, remote_name: str = "gdrive") -> Dict[str, str]:
         """
-        获取用户信息（从 token 文件中提取）
+        获取用户信息（从 token 文件中提取，配置文件未修改时直接返回缓存）
+        
+        连接测试时 about 返回的配额已缓存的话，附带 "quota" 字段（如 "1.50 GB / 15.00 GB"），
+        这里不为取配额额外发起请求。
         
         Args:
             remote_name: 远程名称
@@ -293,18 +652,32 @@ class RcloneWrapper:
         Returns:
             用户信息字典
         """
+        mtime_ns = self._config_mtime_ns()
+        if mtime_ns and self._user_info_cache and self._user_info_cache[0] == mtime_ns:
+            info = dict(self._user_info_cache[1])
+        else:
+            info = self._read_user_info()
+            if mtime_ns:
+                self._user_info_cache = (mtime_ns, info)
+            info = dict(info)
+        
+        # 重新授权（配置文件变化）后旧账号的配额作废
+        cached = self._quota_cache.get(remote_name)
+        quota = cached[1] if cached and cached[0] == mtime_ns else {}
+        if quota.get('total'):
+            info['quota'] = f"{_format_size(quota.get('used', 0))} / {_format_size(quota['total'])}"
+        return info
+    
+    def _read_user_info(self) -> Dict[str, str]:
+        """读取并解析配置文件中的 token，提取用户标识"""
         try:
             # 直接读取并解析配置文件中的 token
             if os.path.exists(self.config_path):
                 with open(self.config_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                     
-                # 提取 token JSON
-                import re
-                import json
-                
-                # 查找 token = {...}
-                token_match = re.search(r'token\s*=\s*(\{[^}]+\})', content)
+                # 提取 token JSON：查找 token = {...}
+                token_match = _TOKEN_RE.search(content)
                 if token_match:
                     try:
                         token_str = token_match.group(1)
@@ -318,14 +691,13 @@ class RcloneWrapper:
                         access_token = token_data.get('access_token', '')
                         if access_token and '.' in access_token:
                             # 简单的 JWT 解码
-                            import base64
                             try:
                                 parts = access_token.split('.')
                                 if len(parts) >= 2:
                                     payload = parts[1]
                                     # 添加padding
-                                    payload += '=' * (4 - len(payload) % 4)
-                                    decoded = base64.b64decode(payload)
+                                    payload += '=' * (-len(payload) % 4)
+                                    decoded = base64.urlsafe_b64decode(payload)  # JWT 使用 URL 安全字母表
                                     payload_data = json.loads(decoded)
                                     if 'email' in payload_data:
                                         return {"email": payload_data['email']}
@@ -342,22 +714,54 @@ class RcloneWrapper:
             return {"email": "Google Drive 用户"}
     
     def test_remote(self, remote_name: str) -> bool:
-        """测试远程连接"""
+        """测试远程连接（配置文件未变时，结果缓存 TEST_REMOTE_CACHE_TTL 秒）"""
+        mtime_ns = self._config_mtime_ns()
+        cached = self._test_remote_cache.get(remote_name)
+        if cached and cached[0] == mtime_ns and time.monotonic() - cached[1] < TEST_REMOTE_CACHE_TTL:
+            return cached[2]
+        
+        result = self._run_test_remote(remote_name)
+        self._test_remote_cache[remote_name] = (mtime_ns, time.monotonic(), result)
+        return result
+    
+    def _run_test_remote(self, remote_name: str) -> bool:
+        """
+        实际测试远程连接：优先通过 rcd 守护进程，不可用时回退到 rclone about
+        
+        about 只查询一次配额，比列目录便宜，认证失效时同样会失败；
+        返回的配额信息顺便缓存，供 get_user_info 显示。
+        """
+        if self._ensure_rcd():
+            try:
+                quota = self._rc('operations/about', timeout=5, fs=f"{remote_name}:")
+                self._quota_cache[remote_name] = (self._config_mtime_ns(), quota)
+                print(f"[Rclone] 远程连接成功: {remote_name}")
+                return True
+            except requests.RequestException as e:
+                print(f"[Rclone] rcd 请求失败，改用 rclone about: {e}")
+            except Exception as e:
+                print(f"[Rclone] 远程连接失败: {e}")
+                return False
+        
         try:
             kwargs = {}
             if os.name == 'nt':
                 kwargs['creationflags'] = 0x08000000 # CREATE_NO_WINDOW
                 
             result = subprocess.run(
-                [self.rclone_path, "lsd", f"{remote_name}:", "--config", self.config_path, "--max-depth", "1"],
+                [self.rclone_path, "about", f"{remote_name}:", "--json", "--config", self.config_path],
                 capture_output=True,
                 encoding='utf-8',  # 使用 UTF-8 编码
                 errors='ignore',   # 忽略编码错误
-                timeout=3,  # 减少到3秒避免卡顿
+                timeout=2,  # 2秒避免卡顿
                 **kwargs
             )
             
             if result.returncode == 0:
+                try:
+                    self._quota_cache[remote_name] = (self._config_mtime_ns(), json.loads(result.stdout))
+                except ValueError:
+                    pass
                 print(f"[Rclone] 远程连接成功: {remote_name}")
                 return True
             else:
@@ -368,48 +772,90 @@ class RcloneWrapper:
             print(f"[Rclone] 测试连接异常: {e}")
             return False
     
-    def list_folder(self, remote_path: str, remote_name: str = "gdrive") -> List[Dict]:
+    def list_directory(self, folder_id: str = "root", remote_name: str = "gdrive") -> Optional[List[Dict]]:
         """
-        列出文件夹内容
+        通过 rcd 守护进程列出一个文件夹的直接子项（字段与 lsjson 相同：Name/ID/IsDir/MimeType...）
+        
+        浏览时每次展开不再启动一个 rclone 进程、解码整段输出；守护进程复用已建立的
+        连接和令牌（令牌过期时由 rclone 自行刷新）。
+        守护进程不可用或请求失败时返回 None，由调用方回退到 rclone lsjson。
+        """
+        if not self._ensure_rcd():
+            return None
+        if folder_id and folder_id != "root":
+            fs = f"{remote_name},root_folder_id={folder_id}:"
+        else:
+            fs = f"{remote_name}:"
+        try:
+            return self._rc('operations/list', timeout=15, fs=fs, remote="").get('list', [])
+        except Exception as e:
+            print(f"[Rclone] rcd 列目录失败，改用 lsjson: {e}")
+            return None
+    
+    def list_folder(self, remote_path: str, remote_name: str = "gdrive") -> Iterator[Dict]:
+        """
+        列出文件夹内容（流式，边读边产出）
+        
+        lsjson 每行输出一个文件对象，逐行解析即可，不必把整个列表读入内存，
+        十万级文件的目录也能立即开始处理。
         
         Args:
             remote_path: 远程路径（文件夹ID或路径）
             remote_name: 远程名称
         
-        Returns:
-            文件列表
+        Yields:
+            文件信息字典
         """
+        process = None
+        # stderr 写入临时文件：大目录树的重试/限速警告可能写满管道缓冲区，
+        # 若用管道且只在 stdout 读完后才读，rclone 会阻塞在写 stderr 上，stdout 循环永远等不到结束
+        stderr_file = tempfile.TemporaryFile()
         try:
             # 使用 lsjson 获取JSON格式的文件列表
             kwargs = {}
             if os.name == 'nt':
                 kwargs['creationflags'] = 0x08000000 # CREATE_NO_WINDOW
                 
-            result = subprocess.run(
+            process = subprocess.Popen(
                 [
                     self.rclone_path, "lsjson",
                     f"{remote_name}:{remote_path}",
                     "--config", self.config_path,
                     "--recursive",
-                    "--files-only"
+                    "--files-only",
+                    "--fast-list",    # 合并为少量大分页请求
+                    "--no-modtime",   # 不需要修改时间和 MIME 类型，省去额外的元数据读取
+                    "--no-mimetype",
                 ],
-                capture_output=True,
-                text=True,
-                timeout=30,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                bufsize=1 << 16,  # 二进制管道，行直接交给 JSON 解析，不先解码成 str
                 **kwargs
             )
             
-            if result.returncode == 0:
-                files = json.loads(result.stdout)
-                print(f"[Rclone] 找到 {len(files)} 个文件")
-                return files
+            count = 0
+            for line in process.stdout:
+                # 输出格式: "[" / "{...}," / "{...}" / "]"
+                line = line.strip().rstrip(b',')
+                if not line or line in (b'[', b']'):
+                    continue
+                yield _json_loads(line)
+                count += 1
+            
+            if process.wait() == 0:
+                print(f"[Rclone] 找到 {count} 个文件")
             else:
-                print(f"[Rclone] 列出文件失败: {result.stderr}")
-                return []
+                stderr_file.seek(0)
+                print(f"[Rclone] 列出文件失败: {stderr_file.read().decode('utf-8', 'replace')}")
                 
         except Exception as e:
             print(f"[Rclone] 列出文件异常: {e}")
-            return []
+        finally:
+            # 调用方提前停止迭代时结束子进程
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_file.close()
     
     def sync_folder(self, 
                    remote_path: str, 
@@ -418,7 +864,8 @@ class RcloneWrapper:
                    progress_callback: Optional[Callable[[RcloneStats], None]] = None,
                    event_callback: Optional[Callable[[str, str, str], None]] = None, # type, message, level
                    stop_flag: Optional[Callable[[], bool]] = None,
-                   log_callback: Optional[Callable[[str, str], None]] = None) -> bool: # message, prefix
+                   log_callback: Optional[Callable[[str, str], None]] = None, # message, prefix
+                   stats_visible: Optional[Callable[[], bool]] = None) -> bool:
         """
         同步文件夹
         
@@ -427,9 +874,10 @@ class RcloneWrapper:
             local_path: 本地路径
             remote_name: 远程名称
             progress_callback: 进度回调
-            event_callback: 事件回调 (type, message, level)
+            event_callback: 事件回调，批量调用 ("batch", [(type, message, level), ...], "INFO")
             stop_flag: 停止标志
             log_callback: 日志回调 (message, level/prefix)
+            stats_visible: 进度是否有人在看；返回 False 时暂停拉取统计（如窗口最小化）
         
         Returns:
             是否成功
@@ -448,7 +896,6 @@ class RcloneWrapper:
                 # 尝试从文件加载
                 settings_file = "config/app_settings.json"
                 if os.path.exists(settings_file):
-                    import json
                     with open(settings_file, 'r', encoding='utf-8') as f:
                         settings = json.load(f)
             
@@ -456,9 +903,10 @@ class RcloneWrapper:
             rclone_settings = settings.get('rclone', {}) if settings else {}
             download_settings = settings.get('download', {}) if settings else {}
             
-            checkers = rclone_settings.get('checkers', 8)
-            transfers = rclone_settings.get('transfers', 4)
-            chunk_size = rclone_settings.get('chunk_size', 64)
+            # Drive 上每个文件的 API 往返占主导，小文件多时并发数决定速度
+            checkers = rclone_settings.get('checkers', 16)
+            transfers = rclone_settings.get('transfers', 16)
+            buffer_size = rclone_settings.get('buffer_size', 0) or 16  # 0 = 自动，使用 16M
             retries = rclone_settings.get('retries', 10)
             low_level_retries = rclone_settings.get('low_level_retries', 10)
             
@@ -472,19 +920,35 @@ class RcloneWrapper:
                 local_path_safe,
                 "--config", self.config_path,
                 # "--drive-root-folder-id", remote_path,  # 移动到下面判断
-                "--progress",
-                "--stats", "1s",
+                "--use-json-log",  # 结构化日志，统计信息直接是数值，无需解析文本
+                "--stats", "0",  # 不定时推送统计，需要时通过 --rc 的 core/stats 拉取
                 "--retries", str(retries),
                 "--low-level-retries", str(low_level_retries),
                 "--checkers", str(checkers),
                 "--transfers", str(transfers),
-                "--drive-chunk-size", f"{chunk_size}M",
+                "--fast-list",  # 一次性分页列出全部文件，而不是逐目录递归
+                "--drive-pacer-min-sleep", "10ms",  # 放宽 Drive API 调用节流
+                "--drive-pacer-burst", "200",
+                # --drive-chunk-size 只影响上传，copy 到本地时不传，避免每个传输白占内存
+                "--buffer-size", f"{buffer_size}M",
+                "--multi-thread-streams", "4",  # 大文件分段并发下载
+                "--multi-thread-cutoff", "100M",
                 "-v",  # 详细输出
                 "--use-server-modtime", # 使用服务器修改时间
                 "--ignore-case-sync",   # 忽略大小写差异（兼容Windows文件系统）
                 "--name-transform", r"all,regex=^(.{235}).+(\.[^.]{1,10})$/$1$2",  # 截断超长文件名但保留扩展名（/分隔符）
             ]
             
+            # 有进度回调时开启本进程的远程控制接口，按界面需要拉取统计
+            # 与守护进程共用随机账号密码（_rc_session 已带认证）；走环境变量，避免出现在日志里的命令行中
+            stats_url = None
+            rc_env = None
+            if progress_callback:
+                rc_port = _free_port()
+                cmd.extend(["--rc", "--rc-addr", f"127.0.0.1:{rc_port}"])
+                rc_env = {**os.environ, "RCLONE_RC_USER": self._rc_user, "RCLONE_RC_PASS": self._rc_pass}
+                stats_url = f"http://127.0.0.1:{rc_port}/core/stats"
+            
             # 如果指定了特定文件夹（且不是根目录），则添加过滤
             if remote_path and remote_path != "root":
                 cmd.extend(["--drive-root-folder-id", remote_path])
@@ -505,396 +969,153 @@ class RcloneWrapper:
             kwargs = {}
             if os.name == 'nt':
                 kwargs['creationflags'] = 0x08000000 # CREATE_NO_WINDOW
+            if rc_env is not None:
+                kwargs['env'] = rc_env
 
             log("正在启动 Rclone 进程...", "⚙")
             self.process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                encoding='utf-8',  # 强制使用 UTF-8
-                errors='ignore',   # 忽略无法解码的字符
-                bufsize=1,
+                bufsize=0,  # 原始字节流，由读取线程自行分块切行
                 **kwargs
             )
             log("Rclone 进程已启动", "✓")
             
-            # 读取输出
-            current_stats = {
-                'bytes_transferred': 0,
-                'total_bytes': 0,
-                'speed': 0,
-                'eta': 0,
-                'errors': 0,
-                'transfers_active': 0,
-                'transfers_complete': 0,
-                'elapsed_time': 0,
-                'transferring': []
-            }
+            last_poll_ts = 0.0
+            last_emit_ts = 0.0
+            last_emit_bytes = 0
+            last_stats_key = None
+            unsent_stats = None  # 被节流丢弃的最新统计，结束时补发
+            pending_events = []
+            last_flush_ts = time.monotonic()
             
-            # 状态标志
-            in_transferring_section = False
+            def emit_event(event_type: str, message: str, level: str):
+                pending_events.append((event_type, message, level))
             
-            for line in self.process.stdout:
-                # 检查停止标志
-                if stop_flag and stop_flag():
-                    log("收到停止信号", "⏹")
-                    self.stop()
-                    return False
-                
-                line = line.strip()
-                if not line:
-                    continue
+            def flush_events(force: bool = False):
+                """把攒下的事件作为一批回调：event_callback("batch", [(type, message, level), ...], "INFO")"""
+                nonlocal last_flush_ts
+                now = time.monotonic()
+                if pending_events and (force or len(pending_events) >= EVENT_BATCH_SIZE
+                                       or now - last_flush_ts >= EVENT_FLUSH_INTERVAL):
+                    event_callback("batch", list(pending_events), "INFO")
+                    pending_events.clear()
+                    last_flush_ts = now
+            
+            def emit_stats(data: Dict, force: bool = False):
+                """合并统计回调：内容未变直接丢弃；间隔太短且新增字节太少时只保留最新一份"""
+                nonlocal last_emit_ts, last_emit_bytes, last_stats_key, unsent_stats
+                key = _stats_key(data)
+                if key == last_stats_key:
+                    return
+                now = time.monotonic()
+                transferred = data.get('bytes', 0)
+                if not force and (now - last_emit_ts < PROGRESS_MIN_INTERVAL
+                                  and transferred - last_emit_bytes < PROGRESS_MIN_BYTES):
+                    unsent_stats = data
+                    return
+                last_stats_key = key
+                last_emit_ts = now
+                last_emit_bytes = transferred
+                unsent_stats = None
+                progress_callback(_stats_from_json(data))
+            
+            def poll_stats(force: bool = False) -> bool:
+                """从 --rc 接口拉取一次 core/stats 并回调；接口不可用时返回 False"""
+                try:
+                    response = self._rc_session.post(stats_url, json={}, timeout=1)
+                    if response.status_code == 200:
+                        emit_stats(response.json(), force=force)
+                        return True
+                except (requests.RequestException, ValueError):
+                    pass  # 远程控制接口尚未就绪（或进程已退出）
+                return False
+            
+            def handle_line(raw: bytes):
+                """处理一行输出：每行是一个 JSON 日志对象，统计信息位于 "stats" 字段"""
+                raw = raw.strip()
+                if not raw:
+                    return
                 
-                # 打印原始日志（用于调试）- 用户要求打印所有环节
-                log(f"[RAW] {line}", "📝")
+                # 打印原始日志（用于调试）- 用户要求打印所有环节；只有这里需要解码成 str
+                log(f"[RAW] {raw.decode('utf-8', 'replace')}", "📝")
                 
-                # --- 解析事件日志 ---
-                # INFO : filename: Copied (new)
-                # INFO : filename: Copied (replaced)
-                # INFO : filename: Unchanged skipping
-                # ERROR : filename: Failed to copy: ...
-                # --- 解析事件日志 (更宽容的解析) ---
-                # INFO : filename: Copied (new)
-                # ERROR : filename: Failed to copy: ...
-                # 2024/02/11 ... : filename: Copied
+                # 大部分 -v 输出（调试信息、检查进度）与界面无关，直接跳过 JSON 解码；
+                # 命中时的分组名即行类别，后面不再逐个比较消息文本
+                match = _LOG_SCAN.search(raw)
+                if not match:
+                    return
+                kind = match.lastgroup
                 
                 try:
-                    # 成功 (Copied)
-                    if ": Copied" in line:
-                        # 尝试提取文件名
-                        # 格式通常是: ... : filename: Copied ...
-                        # 我们找 ": Copied" 之前的部分，再找上一个冒号
-                        
-                        # 简单的切分策略：
-                        # 1. split by ": Copied" -> [prefix_with_filename, suffix]
-                        # 2. prefix_with_filename 如 "2024/.. INFO : my_file.txt"
-                        # 3. taking the last part after " : " might work
-                        
-                        parts = line.split(": Copied")
-                        prefix = parts[0]
-                        extra_info = parts[1].strip() if len(parts) > 1 else ""
-                        
-                        # 寻找文件名起始位置
-                        # Rclone 日志通常有 " : " 分隔前缀和内容
-                        last_colon_index = prefix.rfind(" : ")
-                        if last_colon_index != -1:
-                             file_name = prefix[last_colon_index + 3:].strip()
-                             
-                             if event_callback:
-                                event_callback("success", f"已完成: {file_name} {extra_info}", "INFO")
-                        else:
-                             # 也许没有前缀？直接是文件名？不太可能，但兜底
-                             # 或者格式是 "filename: Copied"
-                             file_name = prefix.strip()
-                             if event_callback:
-                                event_callback("success", f"已完成: {file_name} {extra_info}", "INFO")
-
-                    # 跳过 (Unchanged)
-                    elif ": Unchanged skipping" in line:
-                        if event_callback:
-                             # 提取文件名逻辑同上
-                             parts = line.split(": Unchanged skipping")
-                             prefix = parts[0]
-                             last_colon_index = prefix.rfind(" : ")
-                             if last_colon_index != -1:
-                                 file_name = prefix[last_colon_index + 3:].strip()
-                             else:
-                                 file_name = prefix.strip()
-                             # 用户要求打印所有状态? "日志就是打印所有的处理状态"
-                             # 既然这样，跳过也打印一下吧，用灰色
-                             event_callback("info", f"跳过: {file_name}", "INFO")
-                    
-                    # 错误 (ERROR)
-                    elif "ERROR :" in line or "Failed to copy" in line:
-                         # 尝试提取错误信息
-                         error_msg = line
-                         file_name = "Unknown"
-                         
-                         if "Failed to copy:" in line:
-                             parts = line.split("Failed to copy:")
-                             error_detail = parts[1].strip()
-                             
-                             # 尝试找文件名
-                             prefix = parts[0]
-                             # remove "ERROR :" if present
-                             prefix = prefix.replace("ERROR :", "").strip()
-                             # remove timestamp/level prefix if present
-                             last_colon_index = prefix.rfind(" : ")
-                             if last_colon_index != -1:
-                                 file_name = prefix[last_colon_index + 3:].strip()
-                             elif prefix.endswith(":"):
-                                 file_name = prefix[:-1].strip()
-                             else:
-                                 file_name = prefix
-                                 
-                             error_msg = f"{file_name} -> {error_detail}"
-                         
-                         if event_callback:
-                            event_callback("error", f"失败: {error_msg}", "ERROR")
-
-                except Exception as e:
-                    # print(f"Log parse error: {e}")
-                    pass
-
-                # 解析传输部分标志
-                if line.startswith("Transferring:"):
-                    in_transferring_section = True
-                    current_stats['transferring'] = [] # 清空列表，准备接收新数据
-                    continue
-                elif in_transferring_section and not line.startswith("*"):
-                     # 如果进入了传输部分，但行不是以 * 开头，说明传输部分结束了
-                     pass
-
-                # 解析详细传输文件行
-                # 格式1: * filename: 10% / 50MB, 1.2MB/s, 10s
-                # 格式2: * filename: transferring
-                # 格式3: * filename: 0% / 10MB, 0/s, -
-                if in_transferring_section and line.startswith("*"):
-                    try:
-                        # 移除开头的 "* "
-                        file_line = line[2:].strip()
-                        
-                        # Rclone 输出的文件名可能包含冒号，但进度信息部分通常在最后
-                        # 典型的结尾是: x% / xMB, xMB/s, xs
-                        # 或者: transferring
-                        
-                        file_name = ""
-                        percentage = "0%"
-                        size = "-"
-                        speed = "-"
-                        eta = "-"
-                        status = "等待中" # 默认为等待/传输中
-                        
-                        # 检查是否只有 "transferring"
-                        if file_line.endswith(": transferring"):
-                            file_name = file_line[:-14].strip()
-                            status = "准备传输"
-                        else:
-                            # 尝试查找最后一个冒号，但这不可靠，因为文件名可能有冒号
-                            # 更好的方法是看行尾模式
-                            # 典型的进度部分包含逗号分隔
-                            
-                            last_colon = file_line.rfind(':')
-                            if last_colon != -1:
-                                potential_progress = file_line[last_colon+1:].strip()
-                                # 检查这一段是否像进度信息 (包含 %, /, ,)
-                                if "%" in potential_progress or "transferring" in potential_progress:
-                                    file_name = file_line[:last_colon].strip()
-                                    progress_info = potential_progress
-                                    
-                                    if "transferring" in progress_info:
-                                        status = "准备传输"
-                                    else:
-                                        status = "传输中"
-                                        # 解析进度信息
-                                        # 可能格式 1: 10% / 50MB, 1.2MB/s, 10s
-                                        # 可能格式 2: 50MB / 100MB, 10%, 1.2MB/s, 10s
-                                        parts = [p.strip() for p in progress_info.split(',')]
-                                        
-                                        if len(parts) >= 1:
-                                            part0 = parts[0]
-                                            # 检查第一部分是否包含 %
-                                            if '%' in part0 and '/' in part0:
-                                                # 格式 1: 10% / 50MB
-                                                prog_parts = part0.split('/')
-                                                if len(prog_parts) >= 1:
-                                                    percentage = prog_parts[0].strip()
-                                                if len(prog_parts) >= 2:
-                                                    size = prog_parts[1].strip()
-                                                
-                                                if len(parts) >= 2: speed = parts[1].strip()
-                                                if len(parts) >= 3: eta = parts[2].strip()
-                                            
-                                            elif '/' in part0:
-                                                # 格式 2: 50MB / 100MB
-                                                prog_parts = part0.split('/')
-                                                if len(prog_parts) >= 2:
-                                                    size = prog_parts[1].strip() #取总大小
-                                                
-                                                # 找百分比
-                                                if len(parts) >= 2 and '%' in parts[1]:
-                                                    percentage = parts[1].strip()
-                                                    if len(parts) >= 3: speed = parts[2].strip()
-                                                    if len(parts) >= 4: eta = parts[3].strip()
-                                                else:
-                                                    # 只有大小?
-                                                    pass
-                                            else:
-                                                # 简单的进度?
-                                                pass
-
-                                else:
-                                    # 冒号可能在文件名里，且这行可能不包含标准进度？
-                                    # 暂时假设整行是文件名，或者忽略
-                                    continue
-                            else:
-                                continue
-
-                        current_stats['transferring'].append({
-                            'name': file_name,
-                            'percentage': percentage,
-                            'size': size,
-                            'speed': speed,
-                            'eta': eta,
-                            'status': status
-                        })
-                    except Exception:
-                        pass
-                    continue # 继续处理下一行
-
-                # 解析全局统计信息 (Bytes)
-                if "Transferred:" in line and "100%" not in line and "%" in line:
-                    # Rclone 有两行 Transferred
-                    # 1. Transferred: 57.6 MiB / 57.6 MiB, 100%, 0 B/s, ETA - (Bytes)
-                    # 2. Transferred: 1 / 1, 100% (Files)
-                    
-                    # 尝试匹配 Bytes 行 (带单位 或 纯数字带小数点)
-                    # 注意：有时候 bytes 行也可能没有小数点 if pure bytes, but usually rclone uses units.
-                    # 区分特征：Bytes 行通常有 speed (x B/s) 和 ETA
-                    
-                    if "ETA" in line:
-                         # 重置传输列表标志，因为遇到新的统计块了
-                        in_transferring_section = False
-                        
-                        try:
-                            import re
-                            # 匹配: 1.2 M / 2.4 G
-                            # 或者: 100 / 200 (bytes without units? rare but possible)
-                            # 我们可以依靠 ETA 来确信这是 Bytes/Speed 行
-                            
-                            # 提取传输量和总量的通用匹配
-                            # 寻找 / 分隔的两个值，后面跟一个百分比
-                            # 例子: 57.6 MiB / 57.6 MiB, 100%
-                            parts = line.split(',')
-                            if len(parts) >= 1 and '/' in parts[0]:
-                                counts_part = parts[0].replace("Transferred:", "").strip()
-                                transferred_str, total_str = counts_part.split('/')
-                                
-                                # 解析带单位的数值函数
-                                def parse_rclone_size(s):
-                                    s = s.strip()
-                                    match = re.match(r'(\d+\.?\d*)\s*(\w+)?', s)
-                                    if match:
-                                        val = float(match.group(1))
-                                        unit = match.group(2)
-                                        if unit:
-                                            unit = unit.strip().upper()
-                                            if 'K' in unit: val *= 1024
-                                            elif 'M' in unit: val *= 1024 * 1024
-                                            elif 'G' in unit: val *= 1024 * 1024 * 1024
-                                            elif 'T' in unit: val *= 1024 * 1024 * 1024 * 1024
-                                            elif 'P' in unit: val *= 1024 * 1024 * 1024 * 1024 * 1024
-                                        return int(val)
-                                    return 0
-
-                                current_stats['bytes_transferred'] = parse_rclone_size(transferred_str)
-                                current_stats['total_bytes'] = parse_rclone_size(total_str)
-                            
-                            # 提取速度
-                            # ... 100%, 10.000 MiB/s, ETA ...
-                            speed_match = re.search(r'(\d+\.?\d*)\s*(\w+)/s', line)
-                            if speed_match:
-                                current_stats['speed'] = parse_rclone_size(f"{speed_match.group(1)} {speed_match.group(2)}")
-                            
-                            # 提取 ETA
-                            eta_match = re.search(r'ETA\s+([\w\s]+)', line)
-                            if eta_match:
-                                eta_str = eta_match.group(1).strip()
-                                # 简单解析 ETA (0s, 1m20s, -)
-                                current_stats['eta'] = 0 # 简化，UI可以处理字符串或这里解析成秒
-                                if 's' in eta_str or 'm' in eta_str or 'h' in eta_str:
-                                    # 这里的 ETA 解析比较复杂，暂时先存 0，UI 如果直接用字符串解析更好，但 RcloneStats 定义是 float
-                                    # 尝试解析秒数
-                                    total_seconds = 0
-                                    try:
-                                        # 1h2m3s
-                                        t_parts = re.findall(r'(\d+)([hms])', eta_str)
-                                        for val, unit in t_parts:
-                                            if unit == 'h': total_seconds += int(val) * 3600
-                                            elif unit == 'm': total_seconds += int(val) * 60
-                                            elif unit == 's': total_seconds += int(val)
-                                        current_stats['eta'] = total_seconds
-                                    except:
-                                        pass
-
-                        except Exception:
-                            pass
-                    
+                    msg = _json_loads(raw)  # json/orjson 均可直接解析 bytes
+                except ValueError:
+                    return  # 非 JSON 行（极少数启动输出），只记录原始日志
+                if not isinstance(msg, dict):
+                    return
+                
+                # --- 统计信息 ---
+                if kind == 'stats':
+                    stats_data = msg.get('stats')
+                    if stats_data and progress_callback:
+                        emit_stats(stats_data)
+                    return
+                
+                # --- 事件日志 ---
+                # {"level":"info","msg":"Copied (new)","object":"a/b.txt",...}
+                # {"level":"error","msg":"Failed to copy: ...","object":"a/b.txt",...}
+                if not event_callback:
+                    return
+                text = msg.get('msg', '')
+                file_name = msg.get('object') or ''
+                
+                if kind == 'copied':
+                    # "Copied (new)" 只需切掉首词
+                    emit_event("success", f"已完成: {file_name} {text.partition(' ')[2]}", "INFO")
+                elif kind == 'skipped':
+                    emit_event("info", f"跳过: {file_name}", "INFO")
+                else:
+                    # "Failed to copy: <原因>" 一次切分即可取出原因
+                    reason, sep, detail = text.partition(': ')
+                    if sep and reason == 'Failed to copy':
+                        error_msg = f"{file_name or 'Unknown'} -> {detail.strip()}"
                     else:
-                        # 可能是 Files 行: Transferred: 5 / 10, 50%
-                        # 特征：没有 ETA，没有速度
-                         try:
-                            import re
-                            # 匹配: 5 / 10, 50%
-                            parts = line.split(',')
-                            if len(parts) >= 1 and '/' in parts[0]:
-                                counts_part = parts[0].replace("Transferred:", "").strip()
-                                finished_str, total_str = counts_part.split('/')
-                                current_stats['transfers_complete'] = int(finished_str.strip())
-                                # 这里 total_files 暂时没地方存，复用 transfers_active 或者加一个字段？
-                                # RcloneStats definition: transfers_complete=0, transfers_active (int)
-                                # 我们可以把 Total Files 放在 transfers_active 吗？不，transfers_active 是当前并发数
-                                # 我们需要修改 RcloneStats 或 借用 total_bytes (不行)
-                                # 我们可以把 total files 存在 stats 对象的一个新属性里，但 dataclass 是固定的。
-                                # 让我们看看 RcloneStats 定义。
-                                # 它在 core/rclone_wrapper.py 顶部。
-                                # 我们应该修改 RcloneStats 定义来包含 total_files。
-                                # 但现在没法改定义 (在上面)，我们先用 attributes 动态加？不，dataclass 不行。
-                                # 此时，我们可以把 total_files 临时放到 transfers_active 传出去？
-                                # 或者：transfers_complete 是已完成数。
-                                # 我们可以添加 logic 来计算 errors。
-                                pass # 先不改 RcloneStats 结构，稍后看是否需要
-                                
-                                # 既然不能改 RcloneStats 结构（除非我多做一个 edit call），
-                                # 我将把 (completed, total) tuple 放入 transfers_active (hack) 或者
-                                # 只能修改 RcloneStats 定义。为了稳健，还是修改 RcloneStats 定义吧。
-                                # 但现在我正在 replace_file_content 这一大块。
-                                # 我将在下面的代码中尝试把 stats 作为一个字典传出去 或者 修改 RcloneStats。
-                                # 既然是 dataclass，我必须修改定义。
-                                # 让我先完成这个 block，然后如果需要，我再去修改 RcloneStats 定义。
-                                # 实际上，我可以利用 transfers_active 来传递 total_files? 
-                                # 不，active = 正在传输的。
-                                # 
-                                # Wait, I can send a custom dict or update the parsed stats logic.
-                                # Let's parse 'total_files' here into a variable.
-                                current_stats['total_files'] = int(total_str.strip())
-                                # current_stats 字典有 'transfers_complete'
-                                
-                         except Exception:
-                            pass
+                        error_msg = f"{file_name}: {text}" if file_name else text
+                    emit_event("error", f"失败: {error_msg}", "ERROR")
+            
+            # 按块读取输出；主循环带超时等待，输出安静时也能及时响应停止
+            pipe_lines = _PipeLines(self.process.stdout)
+            
+            while True:
+                # 检查停止标志
+                if stop_flag and stop_flag():
+                    log("收到停止信号", "⏹")
+                    pipe_lines.close()
+                    self.stop()
+                    return False
                 
-                # 解析 Errors
-                if line.startswith("Errors:"):
-                    try:
-                        # Errors: 0
-                        errors_str = line.replace("Errors:", "").strip()
-                        current_stats['errors'] = int(errors_str)
-                    except:
-                        pass
+                batch = pipe_lines.get(timeout=0.1)
+                if batch is None:
+                    break  # 输出结束
+                for raw in batch:
+                    handle_line(raw)
+                if event_callback:
+                    flush_events()
                 
-                # 发送进度
-                if progress_callback and (("Transferred:" in line) or (line.startswith("*") and in_transferring_section)):
-                    # 构造 stats 对象
-                    # 注意：如果 RcloneStats 没有 total_files 字段，我们需要加一下。
-                    # 为了安全，我稍后会去增加这个字段。
-                    # 现在先构造基本对象
-                    
-                    # 动态添加 extra 属性?
-                    stats = RcloneStats(
-                        bytes_transferred=current_stats['bytes_transferred'],
-                        total_bytes=current_stats['total_bytes'],
-                        speed=current_stats['speed'],
-                        eta=current_stats['eta'],
-                        errors=current_stats['errors'],
-                        transfers_active=len(current_stats['transferring']),
-                        transfers_complete=current_stats['transfers_complete'],
-                        elapsed_time=current_stats['elapsed_time'],
-                        transferring=list(current_stats['transferring'])
-                    )
-                    # Hack: 动态添加 total_files 属性
-                    stats.total_files = current_stats.get('total_files', 0)
-                    
-                    progress_callback(stats)
+                # 界面可见时按 PROGRESS_POLL_INTERVAL 拉取统计；不可见时完全不拉取
+                if stats_url and (stats_visible is None or stats_visible()):
+                    now = time.monotonic()
+                    if now - last_poll_ts >= PROGRESS_POLL_INTERVAL:
+                        last_poll_ts = now
+                        poll_stats()
+            
+            if event_callback:
+                flush_events(force=True)
+            # 最后几个文件可能在上次拉取之后才完成（或统计一直不可见）：
+            # 不论可见与否强制再拉取一次最终统计；接口已随进程关闭时补发最后一份被节流的统计
+            if not (stats_url and poll_stats(force=True)) and unsent_stats is not None:
+                emit_stats(unsent_stats, force=True)
             
             # 等待进程结束
             return_code = self.process.wait()
@@ -0,0 +1,93 @@
+"""
+批量 stat 后端 - 为本地对比一次性获取大量文件的元数据
+"""
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# 设置此环境变量可关闭按目录批量读取，退回逐个 os.stat
+DISABLE_ENV = 'TONGBU_DISABLE_BATCH_STAT'
+
+# 文件名大小写不敏感的平台上，目录项里找不到精确匹配时文件仍可能存在
+_CASE_INSENSITIVE = os.name == 'nt' or sys.platform == 'darwin'
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _stat_directory(dir_path: str, names: List[str]) -> Dict[str, Optional[os.stat_result]]:
+    """
+    读取一个目录，返回其中指定文件名的 stat 结果
+    
+    Windows 上 scandir 的目录项自带大小与修改时间，不再需要逐个文件的系统调用；
+    目录不存在时整组文件直接判定为缺失，目录里没有的文件（大小写敏感的平台上）
+    直接由目录清单判定为缺失，同样不再逐个 stat。
+    """
+    try:
+        with os.scandir(dir_path) as it:
+            entries = {entry.name: entry for entry in it}
+    except FileNotFoundError:
+        return dict.fromkeys(names)
+    except OSError:
+        entries = None  # 目录无法读取（如权限不足），全部逐个 stat
+    
+    results = {}
+    for name in names:
+        entry = entries.get(name) if entries is not None else None
+        if entry is not None:
+            try:
+                results[name] = entry.stat()
+                continue
+            except OSError:
+                pass
+        elif entries is not None and not _CASE_INSENSITIVE:
+            results[name] = None
+            continue
+        # 目录里没有精确匹配（如大小写不同）或目录读取失败，单独 stat 兜底
+        results[name] = _stat_or_none(os.path.join(dir_path, name))
+    return results
+
+
+def batch_stat(paths: List[str], max_workers: int = 16) -> List[Optional[os.stat_result]]:
+    """
+    批量获取文件 stat 信息
+    
+    按父目录分组，每个目录只读取一次，目录之间在线程池中并发处理。
+    
+    Args:
+        paths: 文件路径列表
+        max_workers: 并发线程数
+    
+    Returns:
+        与 paths 一一对应的 stat 结果，文件不存在时为 None
+    """
+    max_workers = max(1, max_workers)
+    
+    if os.environ.get(DISABLE_ENV):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_stat_or_none, paths))
+    
+    groups = defaultdict(list)
+    for path in paths:
+        dir_path, name = os.path.split(path)
+        groups[dir_path].append(name)
+    
+    # 只有一个目录（如同一文件夹的一批文件）时不值得开线程池
+    if len(groups) == 1:
+        (dir_path, names), = groups.items()
+        results = _stat_directory(dir_path, names)
+        return [results[name] for name in names]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        dir_results = dict(zip(
+            groups,
+            executor.map(_stat_directory, groups, groups.values())
+        ))
+    
+    return [dir_results[dir_path][name] for dir_path, name in map(os.path.split, paths)]
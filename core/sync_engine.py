@@ -2,14 +2,56 @@
 同步引擎 - 处理增量同步逻辑
 """
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Tuple, Optional, Callable
 from core.gdrive_client import GDriveClient, FileInfo
 from core.downloader import Downloader
-from database.models import Database, SyncTask
+from core.stat_backend import batch_stat
+from database.models import Database, SyncTask, DownloadProgress
 from dateutil import parser as date_parser
 from utils.path_helpers import get_safe_path
 
+STAT_THREADS = 16  # 本地对比时并发 stat 的线程数（阻塞在系统调用上，不受 GIL 限制）
+
+
+def _compile_filter(filters: dict) -> Callable[[FileInfo], bool]:
+    """
+    把过滤规则编译成一个专用的判断函数
+    
+    只为实际配置了的条件生成判断表达式，得到形如
+    lambda f: not f.is_folder() and f.ext in include_exts and f.size >= min_size 的直线代码，
+    逐文件判断时不再有"该条件是否配置"的分支。过滤值通过命名空间传入，不拼接进源码。
+    """
+    namespace = {}
+    terms = ['not f.is_folder()']
+    
+    # 扩展名过滤
+    if 'include_extensions' in filters:
+        namespace['include_exts'] = frozenset(filters['include_extensions'])
+        terms.append('f.ext in include_exts')
+    if filters.get('exclude_extensions'):
+        namespace['exclude_exts'] = frozenset(filters['exclude_extensions'])
+        terms.append('f.ext not in exclude_exts')
+    
+    # 大小过滤
+    if filters.get('min_size') is not None:
+        namespace['min_size'] = filters['min_size']
+        terms.append('f.size >= min_size')
+    if filters.get('max_size') is not None:
+        namespace['max_size'] = filters['max_size']
+        terms.append('f.size <= max_size')
+    
+    # 文件名过滤
+    if 'name_contains' in filters:
+        namespace['name_contains'] = filters['name_contains'].lower()
+        terms.append('name_contains in f.name_lower')
+    if 'name_excludes' in filters:
+        namespace['name_excludes'] = filters['name_excludes'].lower()
+        terms.append('name_excludes not in f.name_lower')
+    
+    return eval(compile('lambda f: ' + ' and '.join(terms), '<filters>', 'eval'), namespace)
+
 
 class SyncEngine:
     """同步引擎"""
@@ -18,6 +60,7 @@ class SyncEngine:
         self.client = gdrive_client
         self.db = db
         self.task_model = SyncTask(db)
+        self.progress_model = DownloadProgress(db)
     
     def compare_files(self, remote_file: FileInfo, local_path: str) -> str:
         """
@@ -31,43 +74,81 @@ class SyncEngine:
             'download' - 需要下载
             'skip' - 跳过（相同）
         """
+        # 一次 stat 同时取得存在性、大小和修改时间
+        try:
+            st = os.stat(local_path)
+        except FileNotFoundError:
+            st = None
+        return self._compare_stat(remote_file, st, local_path)
+    
+    def _compare_stat(self, remote_file: FileInfo, st: Optional[os.stat_result],
+                      local_path: Optional[str] = None) -> str:
+        """
+        根据已取得的本地 stat 结果（None 表示不存在）比较远程和本地文件
+        
+        大小一致但修改时间显示云端更新时，若提供了 local_path 且云端有 MD5，
+        先比对内容：内容相同则把本地修改时间校正为云端时间并跳过，下次直接命中时间判断。
+        """
         # 本地文件不存在
-        if not os.path.exists(local_path):
+        if st is None:
             return 'download'
         
         # 检查文件大小
-        local_size = os.path.getsize(local_path)
-        if local_size != remote_file.size:
+        if st.st_size != remote_file.size:
             return 'download'
         
         # 检查修改时间
         try:
-            local_mtime = datetime.fromtimestamp(os.path.getmtime(local_path))
-            remote_mtime = date_parser.parse(remote_file.modified_time)
+            local_mtime = datetime.fromtimestamp(st.st_mtime)
+            # 构建 FileInfo 时已按 RFC 3339 解析；非标准格式才退回通用解析
+            remote_mtime = remote_file.modified_dt
+            if remote_mtime is None:
+                remote_mtime = date_parser.parse(remote_file.modified_time)
+                
+                # 移除时区信息进行比较
+                if remote_mtime.tzinfo:
+                    remote_mtime = remote_mtime.replace(tzinfo=None)
             
-            # 移除时区信息进行比较
-            if remote_mtime.tzinfo:
-                remote_mtime = remote_mtime.replace(tzinfo=None)
-            
-            # 如果远程文件更新，需要下载
+            # 如果远程文件更新，需要下载（内容相同时只校正时间）
             if remote_mtime > local_mtime:
+                if self._same_content(remote_file, local_path):
+                    # 按与上面相同的口径（去掉时区的云端时间）换算，保证下次比较直接通过
+                    self._touch(local_path, remote_mtime.timestamp())
+                    return 'skip'
                 return 'download'
         except Exception as e:
             print(f"时间比较失败: {e}")
-            # 如果无法比较时间，默认下载
-            return 'download'
+            # 如果无法比较时间，内容不同（或无法比对）时默认下载
+            return 'skip' if self._same_content(remote_file, local_path) else 'download'
         
         # 文件相同，跳过
         return 'skip'
     
+    @staticmethod
+    def _same_content(remote_file: FileInfo, local_path: Optional[str]) -> bool:
+        """用云端 MD5 判断本地文件内容是否一致（Google 文档等无 MD5 时返回 False）"""
+        if not local_path or not remote_file.md5_checksum:
+            return False
+        return Downloader.calculate_md5(local_path).lower() == remote_file.md5_checksum.lower()
+    
+    @staticmethod
+    def _touch(local_path: str, mtime: float):
+        """把本地文件的修改时间设为 mtime（失败只影响下次是否需要重新比对内容）"""
+        try:
+            os.utime(local_path, (mtime, mtime))
+        except OSError as e:
+            print(f"修改时间校正失败: {e}")
+    
     def scan_and_compare(self, task_id: int, 
-                        progress_callback: Optional[Callable[[str], None]] = None) -> Tuple[List[FileInfo], List[FileInfo]]:
+                        progress_callback: Optional[Callable[[str], None]] = None,
+                        stat_threads: int = STAT_THREADS) -> Tuple[List[FileInfo], List[FileInfo]]:
         """
         扫描云端文件并与本地对比
         
         Args:
             task_id: 任务ID
             progress_callback: 进度回调
+            stat_threads: 并发读取本地目录的线程数
         
         Returns:
             (需要下载的文件列表, 跳过的文件列表)
@@ -85,27 +166,43 @@ class SyncEngine:
         if progress_callback:
             progress_callback("正在扫描云端文件...")
         
-        remote_files = self.client.list_files_recursive(
-            folder_id=gdrive_folder_id,
-            progress_callback=progress_callback
-        )
-        
-        # 应用过滤器
-        filtered_files = self.apply_filters(remote_files, filters)
-        
-        # 对比文件
-        to_download = []
-        to_skip = []
-        
-        for file_info in filtered_files:
-            local_path = get_safe_path(os.path.join(local_folder, file_info.path))
-            
-            decision = self.compare_files(file_info, local_path)
+        # 流水线：云端每列完一个文件夹就过滤并提交本地 stat，
+        # 本地读取与后续文件夹的网络请求重叠进行，而不是等整棵树列完再开始
+        prefix = os.path.join(get_safe_path(local_folder), '')
+        predicate = _compile_filter(filters)
+        # 上次已下载完成且云端大小、MD5 未变的文件，本地大小一致即可跳过，
+        # 不再解析时间、比对内容
+        completed = self.progress_model.get_completed(task_id)
+        pending = []
+        with ThreadPoolExecutor(max_workers=max(1, stat_threads)) as stat_pool:
+            for batch in self.client.iter_files_recursive(
+                folder_id=gdrive_folder_id,
+                progress_callback=progress_callback
+            ):
+                # 应用过滤器
+                batch = list(filter(predicate, batch))
+                if not batch:
+                    continue
+                # 本地根目录只规范化一次（含 Windows 长路径前缀），逐个文件只做字符串拼接
+                if os.altsep:
+                    local_paths = [prefix + f.path.replace(os.altsep, os.sep) for f in batch]
+                else:
+                    local_paths = [prefix + f.path for f in batch]
+                # 同一批文件位于同一目录，batch_stat 只读取一次该目录
+                pending.append((batch, local_paths, stat_pool.submit(batch_stat, local_paths, 1)))
             
-            if decision == 'download':
-                to_download.append(file_info)
-            else:
-                to_skip.append(file_info)
+            # 对比文件
+            to_download = []
+            to_skip = []
+            for batch, local_paths, future in pending:
+                for file_info, path, st in zip(batch, local_paths, future.result()):
+                    if (st is not None and st.st_size == file_info.size
+                            and completed.get(file_info.id) == (file_info.size, file_info.md5_checksum or "")):
+                        to_skip.append(file_info)
+                    elif self._compare_stat(file_info, st, path) == 'download':
+                        to_download.append(file_info)
+                    else:
+                        to_skip.append(file_info)
         
         return to_download, to_skip
     
@@ -128,45 +225,7 @@ class SyncEngine:
         Returns:
             过滤后的文件列表
         """
-        filtered = []
-        
-        for file_info in files:
-            # 跳过文件夹
-            if file_info.is_folder():
-                continue
-            
-            # 扩展名过滤
-            if 'include_extensions' in filters:
-                ext = os.path.splitext(file_info.name)[1].lower()
-                if ext not in filters['include_extensions']:
-                    continue
-            
-            if 'exclude_extensions' in filters:
-                ext = os.path.splitext(file_info.name)[1].lower()
-                if ext in filters['exclude_extensions']:
-                    continue
-            
-            # 大小过滤
-            if 'min_size' in filters:
-                if file_info.size < filters['min_size']:
-                    continue
-            
-            if 'max_size' in filters:
-                if file_info.size > filters['max_size']:
-                    continue
-            
-            # 文件名过滤
-            if 'name_contains' in filters:
-                if filters['name_contains'].lower() not in file_info.name.lower():
-                    continue
-            
-            if 'name_excludes' in filters:
-                if filters['name_excludes'].lower() in file_info.name.lower():
-                    continue
-            
-            filtered.append(file_info)
-        
-        return filtered
+        return list(filter(_compile_filter(filters), files))
     
     def start_sync(self, task_id: int,
                    scan_callback: Optional[Callable] = None,
@@ -3,8 +3,20 @@
 """
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+
+# 每次读取任务都要解析 filters 列，优先使用更快的 orjson
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 
 
 class Database:
@@ -12,17 +24,40 @@ class Database:
     
     def __init__(self, db_path: str = "gdrive_sync.db"):
         self.db_path = db_path
+        self._local = threading.local()  # 每个线程一个长期复用的连接
         self.init_database()
     
     def get_connection(self):
-        """获取数据库连接"""
-        return sqlite3.connect(self.db_path)
+        """
+        获取当前线程的数据库连接
+        
+        连接按线程缓存并复用（sqlite3 连接不能跨线程共享），
+        省去每次调用的打开/关闭开销，页缓存和语句缓存也保持有效。
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            # WAL 模式下 NORMAL 已足够安全，提交时不再每次 fsync
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
     
     def init_database(self):
         """初始化数据库表"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # WAL 日志模式（持久化在数据库文件中）：读写互不阻塞，提交开销更小
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # 任务配置表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sync_tasks (
@@ -58,6 +93,16 @@ class Database:
             )
         """)
         
+        # 进度表索引：按任务+状态查询待下载/统计，按任务+文件ID查找记录
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dp_task_status
+            ON download_progress (task_id, status)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dp_task_file
+            ON download_progress (task_id, file_id)
+        """)
+        
         # 错误日志表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS error_logs (
@@ -73,7 +118,6 @@ class Database:
         """)
         
         conn.commit()
-        conn.close()
 
 
 class SyncTask:
@@ -92,7 +136,7 @@ class SyncTask:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        filters_json = json.dumps(filters) if filters else None
+        filters_json = _json_dumps(filters) if filters else None
         
         cursor.execute("""
             INSERT INTO sync_tasks (name, gdrive_folder_id, local_folder, filters, 
@@ -103,48 +147,45 @@ class SyncTask:
         
         task_id = cursor.lastrowid
         conn.commit()
-        conn.close()
         return task_id
     
     def get(self, task_id: int) -> Optional[Dict[str, Any]]:
         """获取任务详情"""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("SELECT * FROM sync_tasks WHERE id = ?", (task_id,))
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             task = dict(row)
             if task['filters']:
-                task['filters'] = json.loads(task['filters'])
+                task['filters'] = _json_loads(task['filters'])
             return task
         return None
     
     def get_all(self):
         """获取所有任务"""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("SELECT * FROM sync_tasks ORDER BY created_at DESC")
         rows = cursor.fetchall()
-        conn.close()
         
         tasks = []
         for row in rows:
             task = dict(row)
             if task['filters']:
-                task['filters'] = json.loads(task['filters'])
+                task['filters'] = _json_loads(task['filters'])
             tasks.append(task)
         return tasks
     
     def update(self, task_id: int, **kwargs):
         """更新任务配置"""
         if 'filters' in kwargs and kwargs['filters']:
-            kwargs['filters'] = json.dumps(kwargs['filters'])
+            kwargs['filters'] = _json_dumps(kwargs['filters'])
         
         set_clause = ", ".join([f"{k} = ?" for k in kwargs.keys()])
         values = list(kwargs.values()) + [task_id]
@@ -153,7 +194,6 @@ class SyncTask:
         cursor = conn.cursor()
         cursor.execute(f"UPDATE sync_tasks SET {set_clause} WHERE id = ?", values)
         conn.commit()
-        conn.close()
     
     def delete(self, task_id: int):
         """删除任务"""
@@ -163,14 +203,89 @@ class SyncTask:
         cursor.execute("DELETE FROM download_progress WHERE task_id = ?", (task_id,))
         cursor.execute("DELETE FROM error_logs WHERE task_id = ?", (task_id,))
         conn.commit()
-        conn.close()
+
+
+class ProgressWriter(threading.Thread):
+    """
+    后台进度写入线程
+    
+    下载线程只登记每条记录的最新进度（字典覆盖，天然丢弃中间值），
+    由本线程每 FLUSH_INTERVAL 秒用一个事务批量写入，提交耗时不再阻塞下载。
+    """
+    
+    FLUSH_INTERVAL = 0.2
+    
+    def __init__(self, db: Database):
+        super().__init__(name="ProgressWriter", daemon=True)
+        self.db = db
+        self._pending = {}  # record_id -> downloaded_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 覆盖“取出 + 写库”的整个过程
+        self._stop_event = threading.Event()
+    
+    def put(self, record_id: int, downloaded_size: int):
+        """登记进度（不阻塞，覆盖该记录尚未写入的旧值）"""
+        with self._lock:
+            self._pending[record_id] = downloaded_size
+    
+    def discard(self, record_id: int):
+        """
+        丢弃记录尚未写入的进度，并等待进行中的批量写入结束
+        
+        返回后该记录不会再有迟到的进度写入，调用方可以安全地同步写入最终状态。
+        """
+        with self._flush_lock, self._lock:
+            self._pending.pop(record_id, None)
+    
+    def flush(self):
+        """把登记的进度一次性写入数据库"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                conn = self.db.get_connection()
+                with conn:
+                    conn.executemany(
+                        DownloadProgress._UPDATE_PROGRESS_SQL,
+                        [(size, 'downloading', 'downloading', record_id)
+                         for record_id, size in pending.items()]
+                    )
+            except sqlite3.Error as e:
+                print(f"写入下载进度失败: {e}")
+    
+    def run(self):
+        while not self._stop_event.wait(self.FLUSH_INTERVAL):
+            self.flush()
+        self.flush()
+        self.db.close()
+    
+    def close(self):
+        """写入剩余进度并结束线程"""
+        self._stop_event.set()
+        self.join()
 
 
 class DownloadProgress:
     """下载进度模型"""
     
+    # 热点语句只保留一份文本，sqlite3 的语句缓存按文本命中
+    _UPDATE_PROGRESS_SQL = """
+        UPDATE download_progress 
+        SET downloaded_size = ?, status = ?,
+            updated_at = CASE WHEN status = ? THEN updated_at ELSE CURRENT_TIMESTAMP END
+        WHERE id = ?
+    """
+    
+    # 节流写入：同一记录的进度至少前进这么多字节才写库
+    MIN_PROGRESS_DELTA = 5 * 1024 * 1024
+    
     def __init__(self, db: Database):
         self.db = db
+        self._last_written = {}  # record_id -> 上次写入的 downloaded_size
+        self._written_lock = threading.Lock()
+        self._writer = None  # 首次节流写入时启动的 ProgressWriter
     
     def create(self, task_id: int, file_id: str, file_path: str, 
                local_path: str, total_size: int, md5_checksum: str) -> int:
@@ -186,29 +301,107 @@ class DownloadProgress:
         
         record_id = cursor.lastrowid
         conn.commit()
-        conn.close()
         return record_id
     
-    def update_progress(self, record_id: int, downloaded_size: int, status: str = 'downloading'):
-        """更新下载进度"""
+    def create_many(self, rows: List[Tuple]):
+        """
+        批量创建下载记录（一个事务，一次提交）
+        
+        Args:
+            rows: [(task_id, file_id, file_path, local_path, total_size, md5_checksum), ...]
+        """
+        if not rows:
+            return
+        conn = self.db.get_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO download_progress 
+                (task_id, file_id, file_path, local_path, total_size, md5_checksum)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+    
+    def get_by_file_ids(self, task_id: int, file_ids: List[str]) -> Dict[str, Dict]:
+        """批量根据文件ID获取进度，返回 {file_id: 记录}（每批不超过 500 个ID）"""
+        if not file_ids:
+            return {}
         conn = self.db.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
-        cursor.execute("""
-            UPDATE download_progress 
-            SET downloaded_size = ?, status = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (downloaded_size, status, record_id))
+        placeholders = ", ".join("?" * len(file_ids))
+        cursor.execute(f"""
+            SELECT * FROM download_progress 
+            WHERE task_id = ? AND file_id IN ({placeholders})
+        """, (task_id, *file_ids))
+        
+        rows = cursor.fetchall()
         
+        return {row['file_id']: dict(row) for row in rows}
+    
+    def update_progress(self, record_id: int, downloaded_size: int, status: str = 'downloading'):
+        """更新下载进度（状态未变时不刷新 updated_at）"""
+        conn = self.db.get_connection()
+        conn.execute(self._UPDATE_PROGRESS_SQL, (downloaded_size, status, status, record_id))
         conn.commit()
-        conn.close()
+    
+    def _forget_written(self, record_id: int):
+        """清除记录的节流状态和排队中的进度（下载结束后调用）"""
+        with self._written_lock:
+            self._last_written.pop(record_id, None)
+            writer = self._writer
+        if writer is not None:
+            writer.discard(record_id)
+    
+    def flush(self):
+        """写入所有排队中的进度并停止后台写入线程（下次节流写入时自动重新启动）"""
+        with self._written_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+    
+    def update_progress_throttled(self, record_id: int, downloaded_size: int, force: bool = False) -> bool:
+        """
+        节流更新下载进度：距上次写入不足 MIN_PROGRESS_DELTA 字节时不写库
+        
+        常规进度交给后台 ProgressWriter 批量写入；强制写入在当前线程同步完成。
+        
+        Args:
+            record_id: 记录ID
+            downloaded_size: 已下载字节数
+            force: 强制写入（如下载结束时），并清除该记录的节流状态
+        
+        Returns:
+            是否写入（或已交给后台写入）
+        """
+        with self._written_lock:
+            last = self._last_written.get(record_id)
+            if not force and last is not None and downloaded_size - last < self.MIN_PROGRESS_DELTA:
+                return False
+            if not force:
+                self._last_written[record_id] = downloaded_size
+                if self._writer is None:
+                    self._writer = ProgressWriter(self.db)
+                    self._writer.start()
+                self._writer.put(record_id, downloaded_size)
+                return True
+        self._forget_written(record_id)
+        self.update_progress(record_id, downloaded_size, 'downloading')
+        return True
     
     def mark_completed(self, record_id: int):
-        """标记为已完成"""
-        self.update_progress(record_id, -1, 'completed')
+        """标记为已完成（只改状态，保留下载结束时写入的 downloaded_size）"""
+        self._forget_written(record_id)
+        conn = self.db.get_connection()
+        conn.execute("""
+            UPDATE download_progress 
+            SET status = 'completed', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (record_id,))
+        conn.commit()
     
     def mark_failed(self, record_id: int, error_msg: str):
         """标记为失败"""
+        self._forget_written(record_id)
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
@@ -220,13 +413,12 @@ class DownloadProgress:
         """, (error_msg, record_id))
         
         conn.commit()
-        conn.close()
     
     def get_by_file_id(self, task_id: int, file_id: str) -> Optional[Dict]:
         """根据文件ID获取进度"""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("""
             SELECT * FROM download_progress 
@@ -234,15 +426,24 @@ class DownloadProgress:
         """, (task_id, file_id))
         
         row = cursor.fetchone()
-        conn.close()
         
         return dict(row) if row else None
     
+    def get_completed(self, task_id: int) -> Dict[str, Tuple[int, str]]:
+        """获取任务已完成的记录，返回 {file_id: (total_size, md5_checksum)}"""
+        conn = self.db.get_connection()
+        cursor = conn.execute("""
+            SELECT file_id, total_size, md5_checksum FROM download_progress 
+            WHERE task_id = ? AND status = 'completed'
+        """, (task_id,))
+        
+        return {file_id: (size, md5) for file_id, size, md5 in cursor}
+    
     def get_pending(self, task_id: int):
         """获取待下载/未完成的文件"""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("""
             SELECT * FROM download_progress 
@@ -251,33 +452,25 @@ class DownloadProgress:
         """, (task_id,))
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
     def get_stats(self, task_id: int) -> Dict[str, int]:
-        """获取任务统计信息"""
+        """获取任务统计信息（按状态分组计数，走 (task_id, status) 索引）"""
         conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed,
-                SUM(CASE WHEN status IN ('pending', 'downloading') THEN 1 ELSE 0 END) as pending
-            FROM download_progress 
+        cursor = conn.execute("""
+            SELECT status, COUNT(*) FROM download_progress 
             WHERE task_id = ?
+            GROUP BY status
         """, (task_id,))
         
-        row = cursor.fetchone()
-        conn.close()
+        counts = dict(cursor.fetchall())
         
         return {
-            'total': row[0] or 0,
-            'completed': row[1] or 0,
-            'failed': row[2] or 0,
-            'pending': row[3] or 0
+            'total': sum(counts.values()),
+            'completed': counts.get('completed', 0),
+            'failed': counts.get('failed', 0),
+            'pending': counts.get('pending', 0) + counts.get('downloading', 0)
         }
 
 
@@ -299,13 +492,12 @@ class ErrorLog:
         """, (task_id, file_path, error_type, error_message, retry_count))
         
         conn.commit()
-        conn.close()
     
     def get_by_task(self, task_id: int):
         """获取任务的所有错误日志"""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute("""
             SELECT * FROM error_logs 
@@ -314,7 +506,6 @@ class ErrorLog:
         """, (task_id,))
         
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
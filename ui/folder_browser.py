@@ -1,37 +1,45 @@
 """
 Google Drive 文件夹浏览对话框（支持显示文件和文件夹）
 """
+import re
+from functools import lru_cache
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget,
-    QTreeWidgetItem, QLabel, QMessageBox, QLineEdit
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTreeView,
+    QLabel, QMessageBox, QLineEdit
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import (
+    Qt, QThread, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, QAbstractItemModel, QModelIndex
+)
+from core.gdrive_client import MULTI_LIST_MAX_PARENTS
+from utils.list_cache import DriveListCache
 from PyQt6.QtGui import QIcon
 
 
-# 根据 MIME 类型判断文件图标
-def _icon_for(item):
-    if item.is_folder():
-        return "📁"
-    mime = item.mime_type or ""
-    if "spreadsheet" in mime or "excel" in mime:
-        return "📊"
-    elif "document" in mime or "word" in mime:
-        return "📄"
-    elif "presentation" in mime or "powerpoint" in mime:
-        return "📑"
-    elif "pdf" in mime:
-        return "📋"
-    elif "image" in mime:
-        return "🖼"
-    elif "video" in mime:
-        return "🎬"
-    elif "audio" in mime:
-        return "🎵"
-    elif "zip" in mime or "compressed" in mime:
-        return "🗜"
-    else:
-        return "📄"
+# MIME 类型分类表：按顺序匹配，先命中者生效
+# （如 officedocument.spreadsheetml 同时包含 document 和 spreadsheet，应归为表格）
+_MIME_PATTERNS = [
+    (re.compile(r'folder'), "📁", "文件夹"),
+    (re.compile(r'spreadsheet|excel'), "📊", "表格"),
+    (re.compile(r'document|word'), "📄", "文档"),
+    (re.compile(r'presentation|powerpoint'), "📑", "演示文稿"),
+    (re.compile(r'pdf'), "📋", "PDF"),
+    (re.compile(r'image'), "🖼", "图片"),
+    (re.compile(r'video'), "🎬", "视频"),
+    (re.compile(r'audio'), "🎵", "音频"),
+    (re.compile(r'zip|compress'), "🗜", "压缩包"),
+]
+
+
+@lru_cache(maxsize=256)
+def classify_mime(mime: str):
+    """根据 MIME 类型返回 (图标, 类型名称)；同一目录中的 MIME 种类很少，结果按 MIME 缓存"""
+    if not mime:
+        return "📄", "文件"
+    for pattern, icon, label in _MIME_PATTERNS:
+        if pattern.search(mime):
+            return icon, label
+    # 取 mime 最后一段便于阅读
+    return "📄", mime.split("/")[-1] if "/" in mime else "文件"
 
 
 def _size_str(size_bytes):
@@ -47,42 +55,444 @@ def _size_str(size_bytes):
     return f"{size_bytes / (1024 * 1024 * 1024):.2f} GB"
 
 
-class ItemScanWorker(QThread):
-    """文件/文件夹扫描工作线程"""
+def _render_rows(items):
+    """
+    生成每个条目的三列显示文本，返回 [(FileInfo, (名称, 大小, 类型)), ...]
+    
+    在扫描线程中调用，界面线程插入时只使用现成的字符串。
+    """
+    rows = []
+    for item in items:
+        if item.is_folder():
+            texts = (f"📁 {item.name}", "", "文件夹")
+        else:
+            icon, label = classify_mime(item.mime_type or "")
+            texts = (f"{icon} {item.name}", _size_str(item.size), label)
+        rows.append((item, texts))
+    return rows
+
+
+_list_pool = None
+
+
+def _get_list_pool() -> QThreadPool:
+    """列目录专用线程池（进程内共享）：网络等待为主，同级文件夹可并行展开"""
+    global _list_pool
+    if _list_pool is None:
+        _list_pool = QThreadPool()
+        _list_pool.setMaxThreadCount(max(4, QThread.idealThreadCount()))
+    return _list_pool
+
+
+class ItemScanSignals(QObject):
+    """ItemScanWorker 的信号桥（QRunnable 本身不能发信号），带回请求方的标识"""
+    
+    items_loaded = pyqtSignal(object, list)   # 标识, 所有条目的 _render_rows 结果
+    subtree_loaded = pyqtSignal(object, dict)  # 标识, {文件夹ID: _render_rows 结果}
+    error_occurred = pyqtSignal(list, str)    # 本批全部标识, 错误信息
+
+
+class ItemScanWorker(QRunnable):
+    """
+    文件/文件夹扫描任务（在线程池中运行）
+    
+    一个任务可以列出多个文件夹：合并成一次 Drive 查询，再按父文件夹分别回调。
+    已排序的结果按文件夹ID缓存（进程内共享），短时间内重复展开不再请求。
+    """
+    
+    cache = DriveListCache()
+    
+    def __init__(self, gdrive_client, requests, signals: ItemScanSignals = None):
+        """
+        Args:
+            gdrive_client: Drive 客户端
+            requests: [(文件夹ID, 标识), ...]，标识随结果原样带回
+            signals: 信号桥
+        """
+        super().__init__()
+        self.gdrive_client = gdrive_client
+        self.requests = requests
+        self.signals = signals or ItemScanSignals()
+    
+    def run(self):
+        try:
+            try:
+                # 加载全部条目（文件夹 + 文件），只请求缓存中没有的文件夹
+                groups = {}
+                missing = []
+                for folder_id, _ in self.requests:
+                    if folder_id not in groups:
+                        cached = self.cache.get(folder_id)
+                        if cached is None:
+                            missing.append(folder_id)
+                        groups[folder_id] = cached
+                if missing:
+                    for folder_id, items in self.gdrive_client.list_folder_contents_multi(missing).items():
+                        # 文件夹排前面，然后按名称排序（小写名称构造 FileInfo 时已算好）
+                        items.sort(key=lambda x: (not x.is_folder(), x.name_lower))
+                        groups[folder_id] = _render_rows(items)
+                        self.cache.put(folder_id, groups[folder_id])
+                for folder_id, tag in self.requests:
+                    self.signals.items_loaded.emit(tag, groups[folder_id])
+            except Exception as e:
+                self.signals.error_occurred.emit([tag for _, tag in self.requests], str(e))
+        except RuntimeError:
+            pass  # 对话框已关闭，信号桥已销毁
+
+
+class SubtreeScanWorker(QRunnable):
+    """
+    展开全部：逐层合并查询列出整个子树（在线程池中运行）
+    
+    各文件夹的结果同时写入 ItemScanWorker.cache，之后单独展开不再请求。
+    """
+    
+    def __init__(self, gdrive_client, folder_id: str, tag, signals: ItemScanSignals, max_depth: int):
+        super().__init__()
+        self.gdrive_client = gdrive_client
+        self.folder_id = folder_id
+        self.tag = tag
+        self.signals = signals
+        self.max_depth = max_depth
+    
+    def run(self):
+        try:
+            try:
+                groups = {}
+                for folder_id, items in self.gdrive_client.list_subtree(self.folder_id, self.max_depth).items():
+                    items.sort(key=lambda x: (not x.is_folder(), x.name_lower))
+                    groups[folder_id] = _render_rows(items)
+                    ItemScanWorker.cache.put(folder_id, groups[folder_id])
+                self.signals.subtree_loaded.emit(self.tag, groups)
+            except Exception as e:
+                self.signals.error_occurred.emit([self.tag], str(e))
+        except RuntimeError:
+            pass  # 对话框已关闭，信号桥已销毁
+
+
+class SearchSignals(QObject):
+    """SearchWorker 的信号桥；generation 用于丢弃已被新搜索取代的结果"""
     
-    items_loaded = pyqtSignal(list)   # 所有条目
-    error_occurred = pyqtSignal(str)
+    search_done = pyqtSignal(int, str, list, str)  # generation, 关键词, 文件夹的 _render_rows 结果, 下一页令牌
+    search_more = pyqtSignal(int, list, str)       # generation, 后续一页的 _render_rows 结果, 下一页令牌
+    search_failed = pyqtSignal(int, str)           # generation, 错误信息
+
+
+class SearchWorker(QRunnable):
+    """文件夹搜索任务（在线程池中运行，不阻塞界面）；page_token 非空时取后续一页"""
     
-    def __init__(self, gdrive_client, parent_id='root'):
+    def __init__(self, gdrive_client, query: str, generation: int, signals: SearchSignals, page_token: str = None):
         super().__init__()
         self.gdrive_client = gdrive_client
-        self.parent_id = parent_id
+        self.query = query
+        self.generation = generation
+        self.signals = signals
+        self.page_token = page_token
     
     def run(self):
         try:
-            # 加载全部条目（文件夹 + 文件）
-            items = self.gdrive_client.list_folder_contents(self.parent_id)
-            # 文件夹排前面，然后按名称排序
-            folders = sorted([i for i in items if i.is_folder()], key=lambda x: x.name.lower())
-            files   = sorted([i for i in items if not i.is_folder()], key=lambda x: x.name.lower())
-            self.items_loaded.emit(folders + files)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
+            try:
+                folders, next_token = self.gdrive_client.search_folders_page(self.query, self.page_token)
+                rows = _render_rows(folders)
+                if self.page_token:
+                    self.signals.search_more.emit(self.generation, rows, next_token or "")
+                else:
+                    self.signals.search_done.emit(self.generation, self.query, rows, next_token or "")
+            except Exception as e:
+                self.signals.search_failed.emit(self.generation, str(e))
+        except RuntimeError:
+            pass  # 对话框已关闭，信号桥已销毁
+
+
+class BatchingExpander(QObject):
+    """
+    合并展开请求：DEBOUNCE_MS 内到达的多个文件夹（如连续展开同级文件夹）
+    合成一个扫描任务，每批最多 MULTI_LIST_MAX_PARENTS 个，用一次 Drive 查询列出
+    """
+    
+    DEBOUNCE_MS = 30
+    
+    def __init__(self, gdrive_client, signals: ItemScanSignals, parent=None):
+        super().__init__(parent)
+        self.gdrive_client = gdrive_client
+        self.signals = signals
+        self._pending = []  # [(文件夹ID, 标识), ...]
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._flush)
+    
+    def request(self, folder_id: str, tag):
+        self._pending.append((folder_id, tag))
+        if not self._timer.isActive():
+            self._timer.start()
+    
+    def _flush(self):
+        batch, folder_ids = [], set()
+        rest = []
+        for folder_id, tag in self._pending:
+            if folder_id in folder_ids or len(folder_ids) < MULTI_LIST_MAX_PARENTS:
+                folder_ids.add(folder_id)
+                batch.append((folder_id, tag))
+            else:
+                rest.append((folder_id, tag))
+        self._pending = rest
+        if batch:
+            _get_list_pool().start(ItemScanWorker(self.gdrive_client, batch, self.signals))
+        if rest:
+            self._timer.start()
 
 
 # 向后兼容旧名称
 FolderScanWorker = ItemScanWorker
 
 
+class _Node:
+    """
+    树节点：info 为扫描得到的 FileInfo；
+    标题行（我的云端硬盘、搜索结果、空目录提示）info 为 None，只有固定文本和可选的文件夹 ID
+    """
+    
+    __slots__ = ('parent', 'row', 'info', 'folder_id', 'title', 'children', 'loaded', 'loading', 'texts', 'more')
+    
+    def __init__(self, parent, row, info=None, texts=None, folder_id=None, title=None, loaded=True):
+        self.parent = parent
+        self.row = row
+        self.info = info
+        self.folder_id = folder_id  # 标题行对应的文件夹 ID（如 'root'）
+        self.title = title          # 标题行选中时显示的名称
+        self.children = []
+        self.loaded = loaded        # 文件夹的子项是否已加载
+        self.loading = False
+        self.texts = texts          # 三列显示文本（扫描线程中已生成）
+        self.more = False           # 还有后续结果页（搜索结果），滚动到底部时再取
+    
+    @property
+    def id(self):
+        return self.info.id if self.info is not None else self.folder_id
+    
+    @property
+    def name(self):
+        return self.info.name if self.info is not None else self.title
+    
+    def is_folder(self) -> bool:
+        return self.info.is_folder() if self.info is not None else self.folder_id is not None
+
+
+class DriveItemsModel(QAbstractItemModel):
+    """
+    Drive 文件树模型
+    
+    每行只是一个轻量 _Node（持有扫描得到的 FileInfo 和扫描线程中生成好的显示文本）；
+    一个文件夹的子项加载完成后一次 beginInsertRows/endInsertRows 整批插入。
+    未加载的文件夹 hasChildren() 为 True 以显示展开箭头，展开时由 fetchMore 请求加载，
+    不再插入“加载中...”占位子项。
+    """
+    
+    HEADERS = ("名称", "大小", "类型")
+    
+    # 需要加载子项时发出（参数为 _Node），由对话框启动扫描线程
+    fetch_requested = pyqtSignal(object)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = _Node(None, 0)
+    
+    # ---- 节点与索引 ----
+    
+    def node(self, index: QModelIndex):
+        return index.internalPointer() if index.isValid() else self._root
+    
+    def _index_of(self, node) -> QModelIndex:
+        """节点对应的索引；节点已不在当前树中（如列表已被重置）时返回无效索引"""
+        if node is self._root:
+            return QModelIndex()
+        n = node
+        while n.parent is not None:
+            n = n.parent
+        if n is not self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+    
+    def index(self, row, column, parent=QModelIndex()):
+        children = self.node(parent).children
+        if 0 <= row < len(children) and 0 <= column < len(self.HEADERS):
+            return self.createIndex(row, column, children[row])
+        return QModelIndex()
+    
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        return len(self.node(parent).children)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+    
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node.children:
+            return True
+        return node.is_folder() and not node.loaded
+    
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return (node.more or (node.is_folder() and not node.loaded)) and not node.loading
+    
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if self.canFetchMore(parent):
+            node.loading = True
+            self.fetch_requested.emit(node)
+    
+    # ---- 显示 ----
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return index.internalPointer().texts[index.column()]
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        node = index.internalPointer()
+        if node.info is None and node.folder_id is None and not node.children:
+            return Qt.ItemFlag.NoItemFlags  # “（空目录）”提示行
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    # ---- 修改 ----
+    
+    def set_top_level(self, texts, folder_id=None, title=None, rows=None, more=False):
+        """
+        重置整棵树为单个标题行
+        
+        Args:
+            texts: 标题行三列文本
+            folder_id: 标题行本身是可展开文件夹时的 ID（子项在展开时加载）
+            title: 标题行被选中时使用的名称
+            rows: 直接作为子项的 _render_rows 结果（如搜索结果）
+            more: rows 之后还有结果页，视图滚动到底部时经 fetch_requested 请求
+        """
+        self.beginResetModel()
+        self._root = _Node(None, 0)
+        top = _Node(self._root, 0, texts=texts, folder_id=folder_id, title=title,
+                    loaded=rows is not None)
+        if rows is not None:
+            top.children = self._make_children(top, rows)
+        top.more = more
+        self._root.children.append(top)
+        self.endResetModel()
+    
+    def append_items(self, node, rows):
+        """文件夹加载完成：一次性插入全部子项（空目录插入一行提示）"""
+        node.loading = False
+        parent_index = self._index_of(node)
+        if node.loaded or (node is not self._root and not parent_index.isValid()):
+            return  # 已加载，或列表已被搜索/刷新替换
+        children = self._make_children(node, rows)
+        if not children:
+            children = [_Node(node, 0, texts=("（空目录）", "", ""))]
+        node.loaded = True
+        self.beginInsertRows(parent_index, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+    
+    def set_subtree(self, node, groups):
+        """
+        展开全部：用整个子树的列表结果一次性替换 node 的子项
+        
+        子树在插入前全部建好，只发出一次 beginInsertRows/endInsertRows；
+        groups 中没有的文件夹（超出层数）保持未加载，展开时再按需请求。
+        """
+        node.loading = False
+        parent_index = self._index_of(node)
+        if node is not self._root and not parent_index.isValid():
+            return  # 列表已被搜索/刷新替换
+        if node.children:
+            self.beginRemoveRows(parent_index, 0, len(node.children) - 1)
+            node.children = []
+            self.endRemoveRows()
+        
+        def build(parent):
+            children = self._make_children(parent, groups[parent.id])
+            if not children:
+                children = [_Node(parent, 0, texts=("（空目录）", "", ""))]
+            for child in children:
+                if child.info is not None and child.info.is_folder() and child.id in groups:
+                    child.children = build(child)
+                    child.loaded = True
+            return children
+        
+        children = build(node)
+        node.loaded = True
+        self.beginInsertRows(parent_index, 0, len(children) - 1)
+        node.children = children
+        self.endInsertRows()
+    
+    def append_page(self, node, rows, more):
+        """追加后续一页结果（只插入这一页的行）"""
+        node.loading = False
+        node.more = more
+        parent_index = self._index_of(node)
+        if not rows or (node is not self._root and not parent_index.isValid()):
+            return
+        start = len(node.children)
+        children = [_Node(node, start + i, info=item, texts=texts, loaded=not item.is_folder())
+                    for i, (item, texts) in enumerate(rows)]
+        self.beginInsertRows(parent_index, start, start + len(children) - 1)
+        node.children.extend(children)
+        self.endInsertRows()
+    
+    def load_failed(self, node):
+        """加载失败：允许再次展开时重试"""
+        node.loading = False
+    
+    @staticmethod
+    def _make_children(parent, rows):
+        return [_Node(parent, row, info=item, texts=texts, loaded=not item.is_folder())
+                for row, (item, texts) in enumerate(rows)]
+
+
 class GDriveFolderBrowser(QDialog):
     """Google Drive 文件夹 / 文件浏览器"""
     
+    SEARCH_DEBOUNCE_MS = 300  # 输入停顿这么久后自动搜索
+    SEARCH_MIN_LENGTH = 2     # 自动搜索的最短关键词长度
+    EXPAND_ALL_DEPTH = 4      # 展开全部时列出的层数
+    
     def __init__(self, gdrive_client, parent=None):
         super().__init__(parent)
         self.gdrive_client = gdrive_client
         self.selected_folder_id = None
         self.selected_folder_name = None
-        self._workers = []  # 防止被垃圾回收
+        # 信号桥常驻主线程，线程池中的扫描结果通过排队连接回到 UI 线程
+        self._scan_signals = ItemScanSignals(self)
+        self._scan_signals.items_loaded.connect(self._on_items_loaded)
+        self._scan_signals.error_occurred.connect(self._on_load_error)
+        self._scan_signals.subtree_loaded.connect(self._on_subtree_loaded)
+        self._expander = BatchingExpander(gdrive_client, self._scan_signals, self)
+        
+        # 搜索在线程池中执行；每次新搜索递增 generation，迟到的旧结果直接丢弃
+        self._search_signals = SearchSignals(self)
+        self._search_signals.search_done.connect(self._on_search_done)
+        self._search_signals.search_more.connect(self._on_search_more)
+        self._search_signals.search_failed.connect(self._on_search_failed)
+        self._search_generation = 0
+        self._search_query = ""
+        self._search_next_token = ""
+        self._search_explicit = False
         self.init_ui()
         self.load_root_folders()
     
@@ -101,21 +511,29 @@ class GDriveFolderBrowser(QDialog):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("输入文件夹名称搜索...")
         self.search_input.returnPressed.connect(self.search_folders)
+        self.search_input.textChanged.connect(self._on_search_text_changed)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._do_search)
         search_layout.addWidget(self.search_input)
         self.search_button = QPushButton("🔍 搜索")
         self.search_button.clicked.connect(self.search_folders)
         search_layout.addWidget(self.search_button)
         layout.addLayout(search_layout)
         
-        # 文件树（三列：名称、大小、类型）
-        self.folder_tree = QTreeWidget()
-        self.folder_tree.setHeaderLabels(["名称", "大小", "类型"])
+        # 文件树（三列：名称、大小、类型），数据由 DriveItemsModel 提供
+        self.model = DriveItemsModel(self)
+        self.model.fetch_requested.connect(self._load_items)
+        self.folder_tree = QTreeView()
+        self.folder_tree.setModel(self.model)
+        self.folder_tree.setUniformRowHeights(True)
         self.folder_tree.setColumnWidth(0, 420)
         self.folder_tree.setColumnWidth(1, 90)
         self.folder_tree.setColumnWidth(2, 120)
-        self.folder_tree.itemExpanded.connect(self.on_item_expanded)
-        self.folder_tree.itemClicked.connect(self.on_item_clicked)
-        self.folder_tree.itemDoubleClicked.connect(self.on_item_double_clicked)
+        self.folder_tree.expanded.connect(self.on_item_expanded)
+        self.folder_tree.clicked.connect(self.on_item_clicked)
+        self.folder_tree.doubleClicked.connect(self.on_item_double_clicked)
         layout.addWidget(self.folder_tree)
         
         # 选中信息
@@ -125,6 +543,10 @@ class GDriveFolderBrowser(QDialog):
         
         # 按钮
         button_layout = QHBoxLayout()
+        self.expand_all_button = QPushButton("展开全部")
+        self.expand_all_button.setToolTip(f"一次性加载并展开所选文件夹下 {self.EXPAND_ALL_DEPTH} 层")
+        self.expand_all_button.clicked.connect(self.expand_all)
+        button_layout.addWidget(self.expand_all_button)
         button_layout.addStretch()
         
         self.select_button = QPushButton("✓ 选择此文件夹")
@@ -142,118 +564,146 @@ class GDriveFolderBrowser(QDialog):
     # ------------------------------------------------------------------
     # 数据加载
     # ------------------------------------------------------------------
-
+    
     def load_root_folders(self):
-        self.folder_tree.clear()
-        
-        root_item = QTreeWidgetItem(self.folder_tree)
-        root_item.setText(0, "📁 我的云端硬盘")
-        root_item.setText(1, "")
-        root_item.setText(2, "根目录")
-        root_item.setData(0, Qt.ItemDataRole.UserRole, {"id": "root", "is_folder": True})
-        
-        placeholder = QTreeWidgetItem(root_item)
-        placeholder.setText(0, "加载中...")
-        
-        self.folder_tree.addTopLevelItem(root_item)
-        root_item.setExpanded(True)
+        self.model.set_top_level(("📁 我的云端硬盘", "", "根目录"), folder_id="root", title="我的云端硬盘")
+        self.folder_tree.expand(self.model.index(0, 0))
     
-    def on_item_expanded(self, item):
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        if not isinstance(data, dict):
-            return
-        if not data.get("is_folder"):
-            return
-        if item.childCount() == 1 and item.child(0).text(0) == "加载中...":
-            self._load_items(item, data["id"])
+    def on_item_expanded(self, index):
+        # 视图展开时通常已自行调用 fetchMore；模型按 loading 状态去重
+        if self.model.canFetchMore(index):
+            self.model.fetchMore(index)
     
-    def _load_items(self, parent_item, folder_id):
-        parent_item.takeChildren()
-        
-        worker = ItemScanWorker(self.gdrive_client, folder_id)
-        worker.items_loaded.connect(lambda items: self._on_items_loaded(parent_item, items))
-        worker.error_occurred.connect(self.on_error)
-        worker.start()
-        self._workers.append(worker)
-    
-    def _on_items_loaded(self, parent_item, items):
-        if not items:
-            empty = QTreeWidgetItem(parent_item)
-            empty.setText(0, "（空目录）")
-            empty.setDisabled(True)
+    def _load_items(self, node):
+        if node.more:
+            # 搜索结果滚动到底部：取下一页
+            _get_list_pool().start(SearchWorker(self.gdrive_client, self._search_query, self._search_generation,
+                                                self._search_signals, self._search_next_token))
             return
-        
-        for item in items:
-            tree_item = QTreeWidgetItem(parent_item)
-            icon = _icon_for(item)
-            tree_item.setText(0, f"{icon} {item.name}")
-            tree_item.setText(1, _size_str(item.size) if not item.is_folder() else "")
-            tree_item.setText(2, "文件夹" if item.is_folder() else _mime_label(item.mime_type))
-            tree_item.setData(0, Qt.ItemDataRole.UserRole, {
-                "id": item.id,
-                "name": item.name,
-                "is_folder": item.is_folder(),
-            })
-            
-            if item.is_folder():
-                # 添加占位符（可能有子项）
-                placeholder = QTreeWidgetItem(tree_item)
-                placeholder.setText(0, "加载中...")
-            else:
-                # 文件不可点击选为同步目标，颜色灰显
-                tree_item.setForeground(0, tree_item.foreground(0))  # 默认色
+        # 同一节点加载期间模型不会重复请求（loading 标记）；同级连续展开合并查询
+        self._expander.request(node.id, node)
+    
+    def _on_items_loaded(self, node, rows):
+        self.model.append_items(node, rows)
+    
+    def expand_all(self):
+        """展开全部：对所选文件夹（未选时为根目录）一次列出整个子树，不走逐个展开的加载路径"""
+        index = self.folder_tree.currentIndex()
+        node = self.model.node(index)
+        if not index.isValid() or node.id is None or not node.is_folder():
+            index = self.model.index(0, 0)
+            node = self.model.node(index)
+        if not index.isValid() or node.id is None or node.loading:
+            return  # 搜索结果标题行等无法整体展开
+        node.loading = True
+        _get_list_pool().start(
+            SubtreeScanWorker(self.gdrive_client, node.id, node, self._scan_signals, self.EXPAND_ALL_DEPTH)
+        )
+    
+    def _on_subtree_loaded(self, node, groups):
+        self.folder_tree.setUpdatesEnabled(False)
+        try:
+            self.model.set_subtree(node, groups)
+            index = self.model._index_of(node)
+            if index.isValid():
+                # 只展开已加载的层；最深一层的文件夹未加载，展开会逐个触发 fetchMore
+                self.folder_tree.expandRecursively(index, self.EXPAND_ALL_DEPTH - 1)
+        finally:
+            self.folder_tree.setUpdatesEnabled(True)
+    
+    def _on_load_error(self, nodes, error_msg):
+        for node in nodes:
+            self.model.load_failed(node)
+        self.on_error(error_msg)
     
     # ------------------------------------------------------------------
     # 事件
     # ------------------------------------------------------------------
-
-    def on_item_clicked(self, item, column):
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        if not isinstance(data, dict):
-            return
-        if not data.get("is_folder"):
+    
+    def on_item_clicked(self, index):
+        node = self.model.node(index)
+        if node.id is None:
+            return  # 标题行
+        if not node.is_folder():
             # 文件不能被选为同步目标
             self.selected_label.setText("⚠ 请选择文件夹（不能选单个文件）")
             self.select_button.setEnabled(False)
             self.selected_folder_id = None
             return
-        folder_id = data["id"]
-        folder_name = data["name"]
+        folder_id = node.id
+        folder_name = node.name
         self.selected_folder_id = folder_id
         self.selected_folder_name = folder_name
         self.selected_label.setText(f"✓ 已选择: {folder_name} (ID: {folder_id})")
         self.select_button.setEnabled(True)
     
-    def on_item_double_clicked(self, item, column):
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        if isinstance(data, dict) and data.get("is_folder"):
-            self.selected_folder_id = data["id"]
-            self.selected_folder_name = data["name"]
+    def on_item_double_clicked(self, index):
+        node = self.model.node(index)
+        if node.id is not None and node.is_folder():
+            self.selected_folder_id = node.id
+            self.selected_folder_name = node.name
             self.accept()
     
     def search_folders(self):
+        """回车 / 搜索按钮：立即搜索"""
         query = self.search_input.text().strip()
         if not query:
             QMessageBox.warning(self, "提示", "请输入搜索关键词")
             return
-        try:
-            folders = self.gdrive_client.search_folders(query)
-            if not folders:
+        self._search_timer.stop()
+        self._start_search(query, explicit=True)
+    
+    def _on_search_text_changed(self, text):
+        """输入变化：重新计时，停顿后自动搜索；清空时回到目录树"""
+        query = text.strip()
+        if not query:
+            self._search_timer.stop()
+            self._search_generation += 1  # 作废进行中的搜索
+            self.load_root_folders()
+        elif len(query) < self.SEARCH_MIN_LENGTH:
+            self._search_timer.stop()
+        else:
+            self._search_timer.start()
+    
+    def _do_search(self):
+        query = self.search_input.text().strip()
+        if len(query) >= self.SEARCH_MIN_LENGTH:
+            self._start_search(query, explicit=False)
+    
+    def _start_search(self, query, explicit):
+        self._search_generation += 1
+        self._search_explicit = explicit
+        _get_list_pool().start(
+            SearchWorker(self.gdrive_client, query, self._search_generation, self._search_signals)
+        )
+    
+    def _on_search_done(self, generation, query, rows, next_token):
+        if generation != self._search_generation:
+            return  # 已有更新的搜索
+        self._search_query = query
+        self._search_next_token = next_token
+        if not rows:
+            if self._search_explicit:
                 QMessageBox.information(self, "搜索结果", f"未找到包含 '{query}' 的文件夹")
                 return
-            self.folder_tree.clear()
-            search_root = QTreeWidgetItem(self.folder_tree)
-            search_root.setText(0, f"🔍 搜索结果: {query}")
-            for folder in folders:
-                fi = QTreeWidgetItem(search_root)
-                fi.setText(0, f"📁 {folder.name}")
-                fi.setText(1, "")
-                fi.setText(2, "文件夹")
-                fi.setData(0, Qt.ItemDataRole.UserRole, {"id": folder.id, "name": folder.name, "is_folder": True})
-            self.folder_tree.addTopLevelItem(search_root)
-            search_root.setExpanded(True)
-        except Exception as e:
-            QMessageBox.critical(self, "搜索错误", f"搜索失败:\n{str(e)}")
+            self.model.set_top_level((f"🔍 未找到包含 '{query}' 的文件夹", "", ""), rows=[])
+            return
+        self.model.set_top_level((f"🔍 搜索结果: {query}", "", ""), rows=rows, more=bool(next_token))
+        self.folder_tree.expand(self.model.index(0, 0))
+    
+    def _on_search_more(self, generation, rows, next_token):
+        if generation != self._search_generation:
+            return
+        self._search_next_token = next_token
+        self.model.append_page(self.model.node(self.model.index(0, 0)), rows, bool(next_token))
+    
+    def _on_search_failed(self, generation, error_msg):
+        if generation != self._search_generation:
+            return
+        top = self.model.node(self.model.index(0, 0))
+        if top.loading:
+            self.model.load_failed(top)  # 取后续页失败：允许再次滚动时重试
+        QMessageBox.critical(self, "搜索错误", f"搜索失败:\n{error_msg}")
     
     def accept_selection(self):
         if self.selected_folder_id:
@@ -266,28 +716,3 @@ class GDriveFolderBrowser(QDialog):
     
     def get_selected_folder(self):
         return self.selected_folder_id, self.selected_folder_name
-
-
-def _mime_label(mime: str) -> str:
-    if not mime:
-        return "文件"
-    if "folder" in mime:
-        return "文件夹"
-    if "spreadsheet" in mime:
-        return "表格"
-    if "document" in mime:
-        return "文档"
-    if "presentation" in mime:
-        return "演示文稿"
-    if "pdf" in mime:
-        return "PDF"
-    if "image" in mime:
-        return "图片"
-    if "video" in mime:
-        return "视频"
-    if "audio" in mime:
-        return "音频"
-    if "zip" in mime or "compress" in mime:
-        return "压缩包"
-    # 取 mime 最后一段便于阅读
-    return mime.split("/")[-1] if "/" in mime else "文件"
@@ -4,56 +4,155 @@ Google Drive 文件夹加载 Worker (QThread)
 """
 
 from PyQt6.QtCore import QThread, pyqtSignal
+import json
+import os
 import subprocess
+import tempfile
+import threading
+from utils.list_cache import DriveListCache
+
+# 大文件夹的 lsjson 输出可达数 MB，优先使用更快的 orjson（直接解析 bytes）
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+LOAD_TIMEOUT = 15         # lsjson 最长运行秒数
+STREAM_BATCH_SIZE = 200   # 流式读取时每攒够这么多条就先发给界面
+PREFETCH_DEPTH = 2        # lsjson 回退时一并列出的层数（子文件夹内容写入缓存）
+
+
+def _lsjson_cmd(rclone_wrapper, folder_id, max_depth=1):
+    """拼出列出 folder_id 的 lsjson 命令（元组，max_depth 为 1 时同时用作缓存键）"""
+    cmd = (
+        rclone_wrapper.rclone_path,
+        "lsjson",
+        "gdrive:",
+        "--config", rclone_wrapper.config_path,
+        "--max-depth", str(max_depth)
+    )
+    if max_depth > 1:
+        cmd += ("-R",)
+    if folder_id and folder_id != "root":
+        cmd += ("--drive-root-folder-id", folder_id)
+    return cmd
+
+
+def _sort_items(items):
+    """文件夹在前，文件在后，同类按名称排序（一次排序完成）"""
+    return sorted(items, key=lambda x: (not x.get('IsDir'), x.get('Name', '').casefold()))
 
 
 class FolderLoadWorker(QThread):
     """异步加载文件夹的 Worker"""
     
-    # 信号
-    folders_loaded = pyqtSignal(list)  # 加载完成，发送文件夹列表
+    # 解析并排序后的列表按完整命令缓存（进程内共享）；刷新时调用 cache.clear()
+    cache = DriveListCache()
+    
+    # 信号：两者发送的条目互不重复，界面把它们都追加到同一父节点即可
+    items_batch = pyqtSignal(list)  # 流式读取时提前发送的一批条目
+    folders_loaded = pyqtSignal(list)  # 加载完成，发送其余（未经 items_batch 发送的）条目
     load_error = pyqtSignal(str)  # 加载错误
     
     def __init__(self, rclone_wrapper, folder_id="root"):
         super().__init__()
         self.rclone_wrapper = rclone_wrapper
         self.folder_id = folder_id
-        
+        # 命令在构造时一次拼好，同时作为缓存键
+        self._cmd = _lsjson_cmd(rclone_wrapper, folder_id)
+    
     def run(self):
         """在后台线程执行"""
         try:
-            # 构建命令
-            cmd = [
-                self.rclone_wrapper.rclone_path,
-                "lsjson",
-                "gdrive:",
-                "--config", self.rclone_wrapper.config_path,
-                "--max-depth", "1"
-            ]
+            key = self._cmd
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.folders_loaded.emit(cached)
+                return
             
-            if self.folder_id and self.folder_id != "root":
-                cmd.extend(["--drive-root-folder-id", self.folder_id])
+            # 优先通过常驻的 rclone rcd 直接取得解析好的列表，免去每次启动进程
+            all_items = self.rclone_wrapper.list_directory(self.folder_id)
+            if all_items is not None:
+                all_items = _sort_items(all_items)
+                self.cache.put(key, all_items)
+                self.folders_loaded.emit(all_items)
+                return
             
-            # 执行命令（在后台线程，不阻塞UI）
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                encoding='utf-8',
-                errors='ignore',
-                timeout=15
-            )
-            
-            if result.returncode == 0:
-                import json
-                all_items = json.loads(result.stdout)
-                # 文件夹在前，文件在后，同类按名称排序
-                folders = sorted([i for i in all_items if i.get('IsDir')], key=lambda x: x.get('Name','').lower())
-                files   = sorted([i for i in all_items if not i.get('IsDir')], key=lambda x: x.get('Name','').lower())
-                self.folders_loaded.emit(folders + files)
-            else:
-                self.load_error.emit(f"Rclone 错误: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            self.load_error.emit("加载超时（15秒）")
+            self._stream_lsjson(_lsjson_cmd(self.rclone_wrapper, self.folder_id, PREFETCH_DEPTH), key)
         except Exception as e:
             self.load_error.emit(str(e))
+    
+    def _stream_lsjson(self, cmd, key):
+        """
+        执行 rclone lsjson 并逐行解析（每行一个对象），每 STREAM_BATCH_SIZE 条先发给界面，
+        大文件夹不必等整个列表读完才显示第一批
+        
+        命令会递归 PREFETCH_DEPTH 层：本层条目（Path 不含 '/'）照常发给界面，
+        更深的条目按所在子文件夹分组写入缓存，之后展开这些子文件夹不必再启动 rclone 进程。
+        """
+        # 执行命令（在后台线程，不阻塞UI）；输出保持为 bytes，直接交给 JSON 解析
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = 0x08000000 # CREATE_NO_WINDOW
+        # stderr 写入临时文件：不读取的 stderr 管道写满后 rclone 会阻塞，
+        # 最终被超时杀掉，真正的错误信息反而显示成“加载超时”
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                bufsize=1 << 16,
+                **kwargs
+            )
+        except Exception:
+            stderr_file.close()
+            raise
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(LOAD_TIMEOUT, kill)
+        timer.start()
+        try:
+            all_items = []
+            batch = []
+            nested = {}  # 子文件夹路径 -> 其中的条目
+            for line in process.stdout:
+                # 输出格式: "[" / "{...}," / "{...}" / "]"
+                line = line.strip().rstrip(b',')
+                if not line or line in (b'[', b']'):
+                    continue
+                item = _json_loads(line)
+                parent, sep, _ = item.get('Path', '').rpartition('/')
+                if sep:
+                    nested.setdefault(parent, []).append(item)
+                    continue
+                all_items.append(item)
+                batch.append(item)
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    self.items_batch.emit(_sort_items(batch))
+                    batch = []
+            return_code = process.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode('utf-8', 'ignore')
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_file.close()
+        
+        if timed_out.is_set():
+            self.load_error.emit(f"加载超时（{LOAD_TIMEOUT}秒）")
+        elif return_code != 0:
+            self.load_error.emit(f"Rclone 错误: {stderr}")
+        else:
+            self.cache.put(key, _sort_items(all_items))
+            for item in all_items:
+                if item.get('IsDir') and item.get('ID'):
+                    children = nested.get(item.get('Path', item.get('Name', '')), [])
+                    self.cache.put(_lsjson_cmd(self.rclone_wrapper, item['ID']), _sort_items(children))
+            self.folders_loaded.emit(_sort_items(batch))
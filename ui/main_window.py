@@ -3,9 +3,10 @@
 """
 import sys
 import os
+import time
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QProgressBar, QTextEdit, QGroupBox, QFileDialog,
+    QLabel, QProgressBar, QGroupBox, QFileDialog,
     QComboBox, QMessageBox, QLineEdit
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
@@ -14,6 +15,27 @@ from datetime import datetime
 from ui.folder_browser import GDriveFolderBrowser
 from database.models import SyncTask
 
+TRANSFER_LOG_MAX_ITEMS = 1000  # 传输事件日志保留的最多条数
+LOG_TIME_FORMAT = "[%Y-%m-%d %H:%M:%S] "  # 日志行前缀
+
+# 文件夹节点的“子项是否已加载”标记（False = 尚未加载，展开时加载）
+_LOADED_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class NodeRef:
+    """
+    Drive 树节点的 UserRole 数据
+    
+    dict 作为 UserRole 数据时每次 setData/data 都要在 Python dict 与 QVariantMap 之间整体转换，
+    普通对象则原样保存；__slots__ 也让上万个节点的内存占用更小。
+    """
+    __slots__ = ('id', 'name', 'is_dir')
+    
+    def __init__(self, id: str, name: str, is_dir: bool = True):
+        self.id = id
+        self.name = name
+        self.is_dir = is_dir
+
 
 def _get_item_icon(is_dir: bool, mime: str = "") -> str:
     """Return emoji icon for a Google Drive item based on type."""
@@ -45,15 +67,20 @@ class RcloneSyncWorker(QThread):
     progress = pyqtSignal(object)  # RcloneStats
     finished = pyqtSignal(bool)  # success
     log = pyqtSignal(str, str)  # message, prefix
-    file_event = pyqtSignal(str, str, str)  # type, message, level
+    file_events = pyqtSignal(list)  # [(type, message, level), ...]
     
-    def __init__(self, rclone_wrapper, remote_path, local_path):
+    def __init__(self, rclone_wrapper, remote_path, local_path, progress_min_interval_ms=150):
         super().__init__()
         self.rclone_wrapper = rclone_wrapper
         self.remote_path = remote_path
         self.local_path = local_path
         self.should_stop = False
         self.is_paused = False
+        self.stats_visible = True  # 主窗口最小化时置为 False，停止拉取进度统计
+        # 进度信号限频：两次发送之间到达的统计只保留最新一份
+        self.progress_min_interval = progress_min_interval_ms / 1000
+        self._last_emit_ts = 0.0
+        self._pending_stats = None
     
     def run(self):
         """执行同步"""
@@ -66,10 +93,12 @@ class RcloneSyncWorker(QThread):
                 local_path=self.local_path,
                 progress_callback=self.on_progress,
                 event_callback=self.on_event,
-                stop_flag=lambda: self.should_stop,
-                log_callback=lambda msg, prefix: self.log.emit(msg, prefix)
+                stop_flag=self._should_stop,
+                log_callback=self.log.emit,
+                stats_visible=self._stats_wanted
             )
             
+            self.flush_progress()
             self.finished.emit(success)
         except Exception as e:
             self.log.emit(f"同步异常: {e}", "✗")
@@ -77,13 +106,35 @@ class RcloneSyncWorker(QThread):
             traceback.print_exc()
             self.finished.emit(False)
     
+    def _should_stop(self):
+        return self.should_stop
+    
+    def _stats_wanted(self):
+        """界面可见且未暂停时才需要拉取进度统计"""
+        return self.stats_visible and not self.is_paused
+    
     def on_event(self, type, message, level):
-        """处理文件事件"""
-        self.file_event.emit(type, message, level)
+        """处理文件事件：一律以列表发出（rclone 以 "batch" 类型批量回调，一批只发一次信号）"""
+        if type == "batch":
+            self.file_events.emit(message)
+        else:
+            self.file_events.emit([(type, message, level)])
     
     def on_progress(self, stats):
-        """进度回调"""
-        if not self.is_paused:
+        """进度回调：最多每 progress_min_interval 秒向界面发送一次，其余只保留最新一份"""
+        if self.is_paused:
+            return
+        self._pending_stats = stats
+        now = time.monotonic()
+        if now - self._last_emit_ts >= self.progress_min_interval:
+            self._last_emit_ts = now
+            self._pending_stats = None
+            self.progress.emit(stats)
+    
+    def flush_progress(self):
+        """发送被限频暂存的最后一份统计（同步结束时调用，保证界面显示最终进度）"""
+        stats, self._pending_stats = self._pending_stats, None
+        if stats is not None and not self.is_paused:
             self.progress.emit(stats)
     
     def stop(self):
@@ -109,6 +160,9 @@ class RcloneSyncWorker(QThread):
 class MainWindow(QMainWindow):
     """主窗口"""
     
+    LOG_FLUSH_MS = 80          # 日志合并刷新间隔
+    LOG_MAX_LINES = 2000       # 日志框保留的最多行数（超出自动删除最旧的）
+    
     def __init__(self):
         super().__init__()
         self.gdrive_client = None
@@ -131,6 +185,17 @@ class MainWindow(QMainWindow):
         # 配置文件路径
         self.config_file = "config/app_config.json"
         
+        # 进度信号合并：积压的进度只应用最新一份
+        self._latest_stats = None
+        self._progress_apply_scheduled = False
+        
+        # 日志先进缓冲区，LOG_FLUSH_MS 内的多条合并成一次追加
+        self._log_buffer = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(self.LOG_FLUSH_MS)
+        self._log_timer.timeout.connect(self._flush_log)
+        
         self.init_ui()
         self.load_settings()  # 加载设置
         
@@ -216,6 +281,8 @@ class MainWindow(QMainWindow):
                 
                 if email:
                     self.log(f"✓ 已授权账号: {email}", "✓")
+                    if user_info.get("quota"):
+                        self.log(f"云端空间: {user_info['quota']}", "ℹ")
                     self.auth_status_label.setText(f"● 已连接: {email}")
                     self.auth_status_label.setStyleSheet("color: green; font-weight: bold;")
                 else:
@@ -423,6 +490,7 @@ class MainWindow(QMainWindow):
         stats_layout = QHBoxLayout()
         stats_layout.setSpacing(15)
         
+        self._last_stats_texts = [None, None, None, None]  # _set_stats_texts 上次设置的文本
         self.stats_total_files = QLabel("📂 总文件: -")
         self.stats_total_size = QLabel("💾 总大小: -")
         self.stats_completed = QLabel("✅ 已完成: -")
@@ -437,15 +505,15 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(stats_layout)
         
-        # 3. 正在传输列表 (QTableWidget)
+        # 3. 正在传输列表 (QTableView + TransferTableModel)
         layout.addWidget(QLabel("正在传输的文件:"))
         
-        from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+        from PyQt6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+        from .transfer_table_model import TransferTableModel
         
-        self.file_table = QTableWidget()
-        self.file_table.setRowCount(10)
-        self.file_table.setColumnCount(5)
-        self.file_table.setHorizontalHeaderLabels(["文件名", "大小", "进度", "速度", "状态"])
+        self.file_table_model = TransferTableModel(self)
+        self.file_table = QTableView()
+        self.file_table.setModel(self.file_table_model)
         
         # 样式设置
         self.file_table.verticalHeader().setVisible(False) # 隐藏行号
@@ -475,15 +543,12 @@ class MainWindow(QMainWindow):
         self.file_table.setColumnWidth(3, 90)
         self.file_table.setColumnWidth(4, 80)
         
-        # 预填充空行以保持稳定
-        for r in range(10):
-            self.file_table.setRowHeight(r, row_height)
-            for c in range(5):
-                item = QTableWidgetItem("")
-                self.file_table.setItem(r, c, item)
+        # 固定行高（模型始终提供 10 行，空闲行为空文本）
+        self.file_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.file_table.verticalHeader().setDefaultSectionSize(row_height)
             
         self.file_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 1px solid #ddd;
                 font-family: 'Segoe UI', sans-serif;
@@ -506,6 +571,7 @@ class MainWindow(QMainWindow):
         from PyQt6.QtWidgets import QListWidget
         self.transfer_log = QListWidget()
         self.transfer_log.setUniformItemSizes(True) # 优化性能
+        self.transfer_log.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         self.transfer_log.setMinimumHeight(200)
         self.transfer_log.setStyleSheet("""
             QListWidget { 
@@ -530,8 +596,10 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout()
         
         # 日志文本框
-        self.log_text = QTextEdit()
+        from PyQt6.QtWidgets import QPlainTextEdit
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.LOG_MAX_LINES)
         self.log_text.setMaximumHeight(150)
         layout.addWidget(self.log_text)
         
@@ -632,11 +700,22 @@ class MainWindow(QMainWindow):
             print(f"保存配置失败: {e}")
     
     def log(self, message: str, prefix: str = "ℹ"):
-        """添加日志"""
-        from datetime import datetime # Ensure datetime is imported for this method
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {prefix} {message}"
-        self.log_text.append(log_entry)
+        """添加日志（时间戳在刷新时统一加上，同一批日志共用一次格式化）"""
+        self._log_buffer.append(f"{prefix} {message}")
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+    
+    def _log_text_now(self):
+        """日志框的完整文本（先写入尚在缓冲区的日志）"""
+        self._flush_log()
+        return self.log_text.toPlainText()
+    
+    def _flush_log(self):
+        """把缓冲的日志一次性追加到日志框（只触发一次文档布局）"""
+        if self._log_buffer:
+            stamp = datetime.now().strftime(LOG_TIME_FORMAT)
+            self.log_text.appendPlainText("\n".join(f"{stamp}{entry}" for entry in self._log_buffer))
+            self._log_buffer.clear()
     
     def on_authenticate(self):
         """Google API 授权（用于浏览文件夹）"""
@@ -713,60 +792,39 @@ class MainWindow(QMainWindow):
             dialog.setLayout(layout)
             
             def load_subfolders(parent_item, folder_id):
-                """延迟加载子文件夹"""
-                import subprocess
-                
-                # 构建命令
-                cmd = [
-                    self.rclone_wrapper.rclone_path,
-                    "lsjson",
-                    "gdrive:",
-                    "--dirs-only",
-                    "--config", self.rclone_wrapper.config_path,
-                    "--max-depth", "1"
-                ]
-                
-                if folder_id and folder_id != "root":
-                    cmd.extend(["--drive-root-folder-id", folder_id])
-                
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        encoding='utf-8',
-                        errors='ignore',
-                        timeout=15
-                    )
-                    
-                    if result.returncode == 0:
-                        import json
-                        folders = json.loads(result.stdout)
+                """延迟加载子文件夹（后台线程列出，不阻塞界面）"""
+                def add_folders(items, done):
+                    for folder in items:
+                        if not folder.get('IsDir'):
+                            continue
+                        folder_name = folder.get('Name', '')
+                        folder_id_sub = folder.get('ID', '')
                         
-                        for folder in folders:
-                            folder_name = folder.get('Name', '')
-                            folder_id_sub = folder.get('ID', '')
-                            
-                            # 创建子节点
-                            child_item = QTreeWidgetItem(parent_item)
-                            child_item.setText(0, f"📁 {folder_name}")
-                            child_item.setData(0, Qt.ItemDataRole.UserRole, {
-                                'id': folder_id_sub,
-                                'name': folder_name
-                            })
-                            
-                            # 添加占位符表示可展开
-                            placeholder = QTreeWidgetItem(child_item)
-                            placeholder.setText(0, "...")
-                            
-                except Exception as e:
-                    self.log(f"加载子文件夹失败: {e}", "⚠")
+                        # 创建子节点
+                        child_item = QTreeWidgetItem(parent_item)
+                        child_item.setText(0, f"📁 {folder_name}")
+                        child_item.setData(0, Qt.ItemDataRole.UserRole, {
+                            'id': folder_id_sub,
+                            'name': folder_name
+                        })
+                        
+                        # 不加占位子项：强制显示展开箭头，并标记为未加载
+                        child_item.setChildIndicatorPolicy(
+                            QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+                        child_item.setData(0, _LOADED_ROLE, False)
+                
+                self._start_folder_load(
+                    folder_id, add_folders,
+                    lambda err: self.log(f"加载子文件夹失败: {err}", "⚠")
+                )
             
             def on_item_expanded(item):
                 """展开节点时加载子文件夹"""
                 # 检查是否已加载
-                if item.childCount() == 1 and item.child(0).text(0) == "...":
-                    # 删除占位符
-                    item.takeChild(0)
+                if item.data(0, _LOADED_ROLE) is False:
+                    item.setData(0, _LOADED_ROLE, True)
+                    item.setChildIndicatorPolicy(
+                        QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless)
                     
                     # 加载真实数据
                     data = item.data(0, Qt.ItemDataRole.UserRole)
@@ -882,67 +940,62 @@ class MainWindow(QMainWindow):
             current_folder_id = ""
             current_folder_name = "根目录"
             folder_stack = []  # 用于返回上级
+            load_generation = 0
             
             def load_folders(folder_id="", folder_name="根目录"):
                 """加载指定文件夹的子文件夹"""
-                nonlocal current_folder_id, current_folder_name
+                nonlocal current_folder_id, current_folder_name, load_generation
                 
                 current_folder_id = folder_id
                 current_folder_name = folder_name
                 current_path_label.setText(folder_name)
                 
                 folder_list.clear()
+                folder_list.addItem("加载中...")
                 self.log(f"正在加载文件夹: {folder_name}...", "📂")
                 
-                # 使用 Rclone lsjson 列出文件夹
-                import subprocess
+                # 在后台线程列出（rcd 优先，回退 lsjson；结果有缓存），不阻塞界面；
+                # 快速连续导航时，过期的结果按 generation 丢弃
+                load_generation += 1
+                generation = load_generation
+                found = 0
                 
-                # Rclone 浏览时，如果有folder_id，使用 --drive-root-folder-id
-                cmd = [
-                    self.rclone_wrapper.rclone_path,
-                    "lsjson",
-                    "gdrive:",  # 总是使用根路径
-                    "--dirs-only",
-                    "--config", self.rclone_wrapper.config_path,
-                    "--max-depth", "1"
-                ]
-                
-                # 如果有文件夹ID，添加参数
-                if folder_id:
-                    cmd.extend(["--drive-root-folder-id", folder_id])
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    timeout=30,
-                    creationflags=0x08000000 # CREATE_NO_WINDOW
-                )
-                
-                if result.returncode == 0:
-                    import json
-                    folders = json.loads(result.stdout)
-                    
-                    if folders:
-                        for folder in folders:
-                            folder_name_item = folder.get('Name', '')
-                            folder_id_item = folder.get('ID', '')
-                            
-                            item = QListWidgetItem(f"📁 {folder_name_item}")
-                            item.setData(Qt.ItemDataRole.UserRole, {
-                                'id': folder_id_item,
-                                'name': folder_name_item
-                            })
-                            folder_list.addItem(item)
+                def add_folders(items, done):
+                    nonlocal found
+                    if generation != load_generation:
+                        return
+                    if found == 0:
+                        folder_list.clear()  # 移除“加载中...”
+                    for folder in items:
+                        if not folder.get('IsDir'):
+                            continue
+                        folder_name_item = folder.get('Name', '')
+                        folder_id_item = folder.get('ID', '')
                         
-                        self.log(f"✓ 找到 {len(folders)} 个文件夹", "✓")
+                        item = QListWidgetItem(f"📁 {folder_name_item}")
+                        item.setData(Qt.ItemDataRole.UserRole, {
+                            'id': folder_id_item,
+                            'name': folder_name_item
+                        })
+                        folder_list.addItem(item)
+                        found += 1
+                    if not done:
+                        return
+                    if found:
+                        self.log(f"✓ 找到 {found} 个文件夹", "✓")
                     else:
+                        folder_list.clear()
                         folder_list.addItem("（此文件夹为空）")
                         self.log("此文件夹没有子文件夹", "ℹ")
-                else:
-                    self.log(f"✗ 加载失败: {result.stderr}", "✗")
-                    QMessageBox.critical(dialog, "错误", f"无法加载文件夹:\n{result.stderr}")
+                
+                def on_error(err):
+                    if generation != load_generation:
+                        return
+                    folder_list.clear()
+                    self.log(f"✗ 加载失败: {err}", "✗")
+                    QMessageBox.critical(dialog, "错误", f"无法加载文件夹:\n{err}")
+                
+                self._start_folder_load(folder_id, add_folders, on_error)
             
             def on_folder_double_click(item):
                 """双击文件夹进入子文件夹"""
@@ -999,9 +1052,6 @@ class MainWindow(QMainWindow):
             # 显示对话框
             dialog.exec()
                 
-        except subprocess.TimeoutExpired:
-            self.log("✗ 加载文件夹超时", "✗")
-            QMessageBox.warning(self, "超时", "获取文件夹列表超时\n\n请直接输入文件夹ID")
         except Exception as e:
             self.log(f"✗ 浏览异常: {e}", "✗")
             QMessageBox.critical(self, "错误", f"浏览文件夹异常:\n{str(e)}\n\n请直接输入文件夹ID")
@@ -1251,18 +1301,8 @@ class MainWindow(QMainWindow):
                 if token_json:
                     # 直接写 rclone.conf（INI 格式）
                     # 注意：不使用 rclone config create，因为它会在验证 token 时再次打开浏览器
-                    config_dir = os.path.dirname(self.rclone_wrapper.config_path)
-                    if config_dir:
-                        os.makedirs(config_dir, exist_ok=True)
-                    
-                    config_content = (
-                        "[gdrive]\n"
-                        "type = drive\n"
-                        "scope = drive\n"
-                        f"token = {token_json}\n"
-                    )
-                    with open(self.rclone_wrapper.config_path, 'w', encoding='utf-8') as f:
-                        f.write(config_content)
+                    config_content = self.rclone_wrapper.build_drive_config(token_json, "gdrive")
+                    self.rclone_wrapper.write_config(config_content)
                     
                     self.log("✓ Rclone 授权成功！", "✓")
                     
@@ -1271,6 +1311,8 @@ class MainWindow(QMainWindow):
                     email = user_info.get("email", "Google Drive")
                     
                     self.log(f"✓ 账号: {email}", "✓")
+                    if user_info.get("quota"):
+                        self.log(f"云端空间: {user_info['quota']}", "ℹ")
                     self.auth_status_label.setText(f"● 已连接: {email}")
                     self.auth_status_label.setStyleSheet("color: green; font-weight: bold;")
                     
@@ -1342,10 +1384,10 @@ class MainWindow(QMainWindow):
             local_folder
         )
         # 连接信号
-        self.sync_worker.progress.connect(self.on_download_progress_rclone)
+        self.sync_worker.progress.connect(self._queue_progress, Qt.ConnectionType.QueuedConnection)
         self.sync_worker.finished.connect(self.on_sync_finished)
         self.sync_worker.log.connect(lambda msg, prefix: self.log(msg, prefix))
-        self.sync_worker.file_event.connect(self.on_file_transfer_event)
+        self.sync_worker.file_events.connect(self.on_file_transfer_events)
         
         # 启动工作线程
         self.sync_worker.start()
@@ -1361,6 +1403,24 @@ class MainWindow(QMainWindow):
         """扫描进度"""
         self.log(message, "🔍")
     
+    def _queue_progress(self, stats):
+        """
+        接收进度信号：只记下最新一份统计，并安排一次界面刷新
+        
+        事件队列中积压的多个进度信号在这里都只是覆盖 _latest_stats，
+        排在它们之后的零延时定时器只用最新的一份刷新一次界面。
+        """
+        self._latest_stats = stats
+        if not self._progress_apply_scheduled:
+            self._progress_apply_scheduled = True
+            QTimer.singleShot(0, self._apply_latest_progress)
+    
+    def _apply_latest_progress(self):
+        self._progress_apply_scheduled = False
+        stats, self._latest_stats = self._latest_stats, None
+        if stats is not None:
+            self.on_download_progress_rclone(stats)
+    
     def on_download_progress_rclone(self, stats):
         """处理 Rclone 进度更新"""
         try:
@@ -1407,10 +1467,13 @@ class MainWindow(QMainWindow):
                 if err_count == 0 and self.failed_count > 0:
                     err_count = self.failed_count
                     
-                self.stats_total_files.setText(f"📂 总文件: {total_files}")
-                self.stats_total_size.setText(f"💾 总大小: {format_size(total)}")
-                self.stats_completed.setText(f"✅ 已完成: {comp_count}")
-                self.stats_failed.setText(f"❌ 失败: {err_count}")
+                # 每次统计通常只有一两项变化，只更新变化的标签
+                self._set_stats_texts((
+                    f"📂 总文件: {total_files}",
+                    f"💾 总大小: {format_size(total)}",
+                    f"✅ 已完成: {comp_count}",
+                    f"❌ 失败: {err_count}",
+                ))
                 
                 # 更新速度和剩余时间
                 speed_mb = stats.speed / (1024 * 1024)
@@ -1422,125 +1485,104 @@ class MainWindow(QMainWindow):
                 
                 self.speed_label.setText(f"🚀 {speed_mb:.1f} MB/s  ⏱ 剩余: {eta_str}")
                 
-                # 更新当前文件列表 (QTableWidget)
-                from PyQt6.QtWidgets import QTableWidgetItem
-                from PyQt6.QtGui import QColor, QBrush
-                
-                transfer_list = stats.transferring if stats.transferring else []
-                
-                # 总是刷新10行
-                for i in range(10):
-                    # 获取单元格 item (假设已初始化过)
-                    item_name = self.file_table.item(i, 0)
-                    item_size = self.file_table.item(i, 1)
-                    item_pct = self.file_table.item(i, 2)
-                    item_speed = self.file_table.item(i, 3)
-                    item_status = self.file_table.item(i, 4)
-                    
-                    if not item_name: # 防御性编程
-                         for c in range(5): self.file_table.setItem(i, c, QTableWidgetItem(""))
-                         item_name = self.file_table.item(i, 0)
-                         # ... reset others if needed
-                    
-                    if i < len(transfer_list):
-                        file_info = transfer_list[i]
-                        
-                        name = file_info.get('name', '')
-                        size = file_info.get('size', '-')
-                        pct = file_info.get('percentage', '0%')
-                        speed = file_info.get('speed', '-')
-                        status = file_info.get('status', '等待中')
-                        
-                        # 设置文本
-                        item_name.setText(name)
-                        item_name.setToolTip(name) # 鼠标悬停显示全名
-                        item_size.setText(size)
-                        item_pct.setText(pct)
-                        item_speed.setText(speed)
-                        item_status.setText(status)
-                        
-                        # 状态颜色
-                        if status == "传输中":
-                            item_status.setForeground(QBrush(QColor("#1976D2")))
-                        elif status == "准备传输":
-                            item_status.setForeground(QBrush(QColor("#F57C00")))
-                        else:
-                            item_status.setForeground(QBrush(QColor("#666666")))
-                            
-                        # 对齐方式
-                        item_size.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                        item_pct.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                        item_speed.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                        item_status.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
-
-                    else:
-                        # 清空该行
-                        item_name.setText("")
-                        item_name.setToolTip("")
-                        item_size.setText("")
-                        item_pct.setText("")
-                        item_speed.setText("")
-                        item_status.setText("")
+                # 更新当前文件列表：模型整体替换，只对变化的行发一次 dataChanged
+                self.file_table_model.set_transfers(stats.transferring or [])
                 
         except Exception as e:
             print(f"进度更新错误: {e}")
 
-    def on_file_transfer_event(self, type, message, level):
-        """处理文件传输事件"""
-        from PyQt6.QtWidgets import QListWidgetItem
+    def on_file_transfer_events(self, events):
+        """
+        处理一批文件传输事件
+        
+        先格式化出整批文本，再暂停重绘、用 addItems 一次插入并一次裁剪到 1000 条，
+        整批只做一次布局；最后只滚动和刷新统计一次。
+        """
         from PyQt6.QtCore import Qt
         
+        texts = []
+        colors = []
+        for type, message, level in events:
+            texts.append(self._format_transfer_event(type, message))
+            colors.append(Qt.GlobalColor.black if type == "info" else
+                          (Qt.GlobalColor.darkGreen if type == "success" else Qt.GlobalColor.darkRed))
+        # 超出上限的部分插入后也会被立即裁掉，直接不插
+        texts = texts[-TRANSFER_LOG_MAX_ITEMS:]
+        colors = colors[-TRANSFER_LOG_MAX_ITEMS:]
+        
+        log_list = self.transfer_log
+        log_list.setUpdatesEnabled(False)
+        try:
+            start = log_list.count()
+            log_list.addItems(texts)
+            for row, color in enumerate(colors, start):
+                log_list.item(row).setForeground(color)
+            # 保持最多 TRANSFER_LOG_MAX_ITEMS 条，移除最旧的
+            for _ in range(log_list.count() - TRANSFER_LOG_MAX_ITEMS):
+                log_list.takeItem(0)
+        finally:
+            log_list.setUpdatesEnabled(True)
+        self._refresh_transfer_log()
+    
+    def _format_transfer_event(self, type, message):
+        """生成一条传输事件的显示文本，同时更新完成/失败计数"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         
         if type == "success":
-            color = "#2E7D32" # Green
             icon = "✅"
             self.completed_count += 1
         elif type == "error":
-            color = "#C62828" # Red
             icon = "❌"
             self.failed_count += 1
         else:
-            color = "#333333"
             icon = "ℹ"
             
         file_msg = message.replace("已完成:", "").replace("错误:", "").strip()
         
-        # 创建列表项
-        item_text = f"[{timestamp}] {icon} {file_msg}"
-        item = QListWidgetItem(item_text)
-        item.setForeground(Qt.GlobalColor.black if type == "info" else 
-                          (Qt.GlobalColor.darkGreen if type == "success" else Qt.GlobalColor.darkRed))
-        
-        # 添加到顶部或底部? 用户通常习惯看最新的在底部，并自动滚动
-        self.transfer_log.addItem(item)
-        
-        # 保持最多1000条
-        if self.transfer_log.count() > 1000:
-            self.transfer_log.takeItem(0) # 移除第一条（最旧的）
-            
-        # 自动滚动到底部
-        self.transfer_log.scrollToBottom()
-        
         # 同时也记录到主日志
         if type == "error":
              self.log(f"传输错误: {file_msg}", "❌")
         
+        return f"[{timestamp}] {icon} {file_msg}"
+    
+    def _refresh_transfer_log(self):
+        """滚动传输日志并更新统计"""
+        # 自动滚动到底部
+        self.transfer_log.scrollToBottom()
+        
         # 更新统计
         self.update_stats()
 
     def update_stats(self):
         """更新统计信息 (文件事件回调使用)"""
-        # 这个方法由 on_file_transfer_event 调用
+        # 这个方法由 on_file_transfer_events 调用
         # 主要用于更新完成/失败计数
         # 注意：on_download_progress_rclone 也会更新这些，但每秒一次
         # 这里为了实时反馈
         
         try:
-            self.stats_completed.setText(f"✅ 已完成: {self.completed_count}")
-            self.stats_failed.setText(f"❌ 失败: {self.failed_count}")
+            self._set_stats_texts((
+                None,
+                None,
+                f"✅ 已完成: {self.completed_count}",
+                f"❌ 失败: {self.failed_count}",
+            ))
         except:
             pass
+    
+    def _set_stats_texts(self, texts):
+        """
+        按 (总文件, 总大小, 已完成, 失败) 顺序更新统计标签
+        
+        与上次设置的文本比较，只对变化的标签调用 setText（None 表示不更新该项），
+        避免每次统计都让四个标签重新计算样式和布局。
+        """
+        labels = (self.stats_total_files, self.stats_total_size, self.stats_completed, self.stats_failed)
+        last = self._last_stats_texts
+        for i, text in enumerate(texts):
+            if text is not None and text != last[i]:
+                labels[i].setText(text)
+                last[i] = text
 
     def on_sync_finished(self, success):
         """同步完成"""
@@ -1561,7 +1603,7 @@ class MainWindow(QMainWindow):
                 log_path = os.path.abspath(log_filename)
                 
                 with open(log_path, 'w', encoding='utf-8') as f:
-                    f.write(self.log_text.toPlainText())
+                    f.write(self._log_text_now())
                 
                 self.log(f"错误日志已保存: {log_path}", "ℹ")
                 
@@ -1600,7 +1642,7 @@ class MainWindow(QMainWindow):
                 self.sync_worker.progress.disconnect()
                 self.sync_worker.finished.disconnect()
                 self.sync_worker.log.disconnect()
-                self.sync_worker.file_event.disconnect()
+                self.sync_worker.file_events.disconnect()
             except:
                 pass  # 如果已经断开连接，忽略错误
             
@@ -1674,7 +1716,7 @@ class MainWindow(QMainWindow):
             
             if filename:
                 # 获取日志内容
-                log_content = self.log_text.toPlainText()
+                log_content = self._log_text_now()
                 
                 # 导出为CSV
                 import csv
@@ -1729,7 +1771,7 @@ class MainWindow(QMainWindow):
             gdrive_folder,
             local_folder
         )
-        self.sync_worker.progress.connect(self.on_download_progress_rclone)
+        self.sync_worker.progress.connect(self._queue_progress, Qt.ConnectionType.QueuedConnection)
         self.sync_worker.finished.connect(self.on_sync_finished)
         self.sync_worker.log.connect(lambda msg, prefix: self.log(msg, prefix))
         
@@ -1850,6 +1892,13 @@ class MainWindow(QMainWindow):
             # TODO: 导出日志到CSV
             self.log(f"日志已导出: {file_path}", "✓")
     
+    def changeEvent(self, event):
+        """窗口状态变化：最小化时让同步线程停止拉取进度统计"""
+        from PyQt6.QtCore import QEvent
+        if event.type() == QEvent.Type.WindowStateChange and getattr(self, "sync_worker", None):
+            self.sync_worker.stats_visible = not self.isMinimized()
+        super().changeEvent(event)
+    
     def closeEvent(self, event):
         """窗口关闭事件"""
         # 如果正在同步，先停止
@@ -1932,42 +1981,24 @@ class MainWindow(QMainWindow):
         self.gdrive_tree.clear()
         self.log("正在加载 Google Drive...", "📂")
         
+        # 刷新（或重新授权后重载）时丢弃缓存的文件夹列表
+        FolderLoadWorker.cache.clear()
+        
         # 添加根节点
         self.root_item = QTreeWidgetItem(self.gdrive_tree)
         self.root_item.setText(0, "📁 我的云端硬盘")
-        self.root_item.setData(0, Qt.ItemDataRole.UserRole, {'id': 'root', 'name': '我的云端硬盘'})
+        self.root_item.setData(0, Qt.ItemDataRole.UserRole, NodeRef('root', '我的云端硬盘'))
         
         # 使用 QThread 在后台加载，完全不阻塞UI
         self.folder_worker = FolderLoadWorker(self.rclone_wrapper, "root")
+        self.folder_worker.items_batch.connect(lambda items: self._populate_tree_items(items, self.root_item))
         self.folder_worker.folders_loaded.connect(lambda folders: self._on_root_loaded(folders, self.root_item))
         self.folder_worker.load_error.connect(lambda err: self.log(f"加载失败: {err}", "✗"))
         self.folder_worker.start()
     
     def _on_root_loaded(self, items, root_item):
         """根目录加载完成回调"""
-        from PyQt6.QtWidgets import QTreeWidgetItem
-        from PyQt6.QtCore import Qt
-        
-        for item in items:
-            item_name = item.get('Name', '')
-            item_id   = item.get('ID', '')
-            is_dir    = item.get('IsDir', False)
-            mime      = item.get('MimeType', '')
-            icon      = _get_item_icon(is_dir, mime)
-            
-            child_item = QTreeWidgetItem(root_item)
-            child_item.setText(0, f"{icon} {item_name}")
-            child_item.setData(0, Qt.ItemDataRole.UserRole, {
-                'id': item_id,
-                'name': item_name,
-                'is_dir': is_dir,
-            })
-            
-            if is_dir:
-                # 文件夹添加占位符
-                placeholder = QTreeWidgetItem(child_item)
-                placeholder.setText(0, "...")
-        
+        self._populate_tree_items(items, root_item)
         root_item.setExpanded(True)
         self.log(f"✓ Google Drive 加载完成", "✓")
     
@@ -1977,20 +2008,61 @@ class MainWindow(QMainWindow):
         
         # 使用 QThread 在后台加载
         worker = FolderLoadWorker(self.rclone_wrapper, folder_id)
-        worker.folders_loaded.connect(lambda folders: self._populate_tree_items(folders, parent_item))
-        worker.load_error.connect(lambda err: self.log(f"加载子文件夹失败: {err}", "⚠"))
+        # 大文件夹的前几批条目提前到达，与最终的其余条目一样追加到父节点
+        worker.items_batch.connect(lambda items: self._populate_tree_items(items, parent_item))
+        worker.folders_loaded.connect(lambda folders: self._on_subfolder_loaded(folders, parent_item))
+        worker.load_error.connect(lambda err: self._on_subfolder_error(err, parent_item))
         worker.start()
         
-        # 保存 worker 引用，防止被垃圾回收
+        self._keep_folder_worker(worker)
+    
+    def _start_folder_load(self, folder_id, on_items, on_error):
+        """
+        在后台线程列出一个文件夹（FolderLoadWorker：rcd 优先、lsjson 回退、结果缓存）
+        
+        on_items(items, done) 可能被调用多次：大文件夹先分批送达（done=False），最后一次 done=True。
+        """
+        from .folder_load_worker import FolderLoadWorker
+        
+        worker = FolderLoadWorker(self.rclone_wrapper, folder_id)
+        worker.items_batch.connect(lambda items: on_items(items, False))
+        worker.folders_loaded.connect(lambda items: on_items(items, True))
+        worker.load_error.connect(on_error)
+        worker.start()
+        self._keep_folder_worker(worker)
+    
+    def _keep_folder_worker(self, worker):
+        """保存 worker 引用防止被垃圾回收，线程结束后释放"""
         if not hasattr(self, '_folder_workers'):
             self._folder_workers = []
         self._folder_workers.append(worker)
+        worker.finished.connect(lambda: self._folder_workers.remove(worker))
+    
+    def _on_subfolder_loaded(self, items, parent_item):
+        """子文件夹加载完成：追加其余条目；空文件夹不再显示展开箭头"""
+        from PyQt6.QtWidgets import QTreeWidgetItem
+        
+        self._populate_tree_items(items, parent_item)
+        parent_item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicatorWhenChildless)
+    
+    def _on_subfolder_error(self, err, parent_item):
+        """加载失败：移除已分批插入的部分条目并恢复未加载标记，再次展开时重试"""
+        # 不清掉已到达的批次，重试时整个列表会追加在其后，出现重复条目
+        parent_item.takeChildren()
+        parent_item.setData(0, _LOADED_ROLE, False)
+        self.log(f"加载子文件夹失败: {err}", "⚠")
     
     def _populate_tree_items(self, items, parent_item):
-        """填充树节点（在主线程执行）"""
+        """
+        填充树节点（在主线程执行）
+        
+        先构造不挂到树上的节点，再用 addChildren 一次性插入，
+        插入期间暂停重绘和排序，整批只触发一次视图更新。
+        """
         from PyQt6.QtWidgets import QTreeWidgetItem
         from PyQt6.QtCore import Qt
         
+        children = []
         for item in items:
             item_name = item.get('Name', '')
             item_id   = item.get('ID', '')
@@ -1998,50 +2070,46 @@ class MainWindow(QMainWindow):
             mime      = item.get('MimeType', '')
             icon      = _get_item_icon(is_dir, mime)
             
-            child_item = QTreeWidgetItem(parent_item)
-            child_item.setText(0, f"{icon} {item_name}")
-            child_item.setData(0, Qt.ItemDataRole.UserRole, {
-                'id': item_id,
-                'name': item_name,
-                'is_dir': is_dir,
-            })
+            child_item = QTreeWidgetItem([f"{icon} {item_name}"])
+            child_item.setData(0, Qt.ItemDataRole.UserRole, NodeRef(item_id, item_name, is_dir))
             
             if is_dir:
-                placeholder = QTreeWidgetItem(child_item)
-                placeholder.setText(0, "...")
+                # 文件夹不加占位子项：强制显示展开箭头，并标记为未加载
+                child_item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+                child_item.setData(0, _LOADED_ROLE, False)
+            children.append(child_item)
+        
+        tree = self.gdrive_tree
+        sorting = tree.isSortingEnabled()
+        tree.setUpdatesEnabled(False)
+        tree.setSortingEnabled(False)
+        try:
+            parent_item.addChildren(children)
+        finally:
+            tree.setSortingEnabled(sorting)
+            tree.setUpdatesEnabled(True)
     
     def on_tree_item_expanded(self, item):
         """展开节点时加载子目录（嵌入式版本）"""
         from PyQt6.QtCore import Qt
         
-        if item.childCount() == 1 and item.child(0).text(0) == "...":
-            item.takeChild(0)
+        if item.data(0, _LOADED_ROLE) is False:
+            item.setData(0, _LOADED_ROLE, True)
             
             data = item.data(0, Qt.ItemDataRole.UserRole)
-            if data and isinstance(data, dict) and data.get('is_dir', True):
-                folder_id = data['id']
-                self.load_subfolders_embedded(item, folder_id)
+            if isinstance(data, NodeRef) and data.is_dir:
+                self.load_subfolders_embedded(item, data.id)
     
     def on_tree_item_clicked(self, item, column):
         """点击树节点"""
         from PyQt6.QtCore import Qt
         data = item.data(0, Qt.ItemDataRole.UserRole)
-        if not isinstance(data, dict):
+        if not isinstance(data, NodeRef):
             return
-        if not data.get('is_dir', True):
+        if not data.is_dir:
             # 文件不能选为同步目标
             return
-        self.select_folder_from_tree_embedded(data['id'], data['name'])
-    
-    def on_tree_item_clicked(self, item, column):
-        """点击树节点自动选择"""
-        from PyQt6.QtCore import Qt
-        
-        data = item.data(0, Qt.ItemDataRole.UserRole)
-        if data and isinstance(data, dict):
-            folder_id = data['id']
-            folder_name = data['name']
-            self.select_folder_from_tree_embedded(folder_id, folder_name)
+        self.select_folder_from_tree_embedded(data.id, data.name)
     
     def select_folder_from_tree_embedded(self, folder_id, folder_name):
         """从嵌入式树中选择文件夹"""
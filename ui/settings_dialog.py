@@ -75,15 +75,15 @@ class SettingsDialog(QDialog):
         concurrent_layout = QFormLayout()
         
         self.checkers_spin = QSpinBox()
-        self.checkers_spin.setRange(1, 32)
-        self.checkers_spin.setValue(8)
-        self.checkers_spin.setToolTip("并发检查文件的数量（默认：8）")
+        self.checkers_spin.setRange(1, 64)
+        self.checkers_spin.setValue(16)
+        self.checkers_spin.setToolTip("并发检查文件的数量（默认：16）")
         concurrent_layout.addRow("并发检查数:", self.checkers_spin)
         
         self.transfers_spin = QSpinBox()
-        self.transfers_spin.setRange(1, 16)
-        self.transfers_spin.setValue(4)
-        self.transfers_spin.setToolTip("并发传输文件的数量（默认：4）")
+        self.transfers_spin.setRange(1, 64)
+        self.transfers_spin.setValue(16)
+        self.transfers_spin.setToolTip("并发传输文件的数量，小文件多时调高效果明显（默认：16）")
         concurrent_layout.addRow("并发传输数:", self.transfers_spin)
         
         concurrent_group.setLayout(concurrent_layout)
@@ -97,14 +97,14 @@ class SettingsDialog(QDialog):
         self.chunk_size_spin.setRange(1, 256)
         self.chunk_size_spin.setValue(64)
         self.chunk_size_spin.setSuffix(" MB")
-        self.chunk_size_spin.setToolTip("Drive 分块大小（默认：64MB）")
+        self.chunk_size_spin.setToolTip("Drive 分块大小，仅影响上传（默认：64MB）")
         performance_layout.addRow("分块大小:", self.chunk_size_spin)
         
         self.buffer_size_spin = QSpinBox()
         self.buffer_size_spin.setRange(0, 256)
         self.buffer_size_spin.setValue(0)
         self.buffer_size_spin.setSuffix(" MB")
-        self.buffer_size_spin.setToolTip("缓冲区大小，0=自动（默认：0）")
+        self.buffer_size_spin.setToolTip("每个传输的读缓冲区大小，0=自动（16MB）（默认：0）")
         performance_layout.addRow("缓冲区:", self.buffer_size_spin)
         
         performance_group.setLayout(performance_layout)
@@ -224,8 +224,8 @@ class SettingsDialog(QDialog):
         """加载设置"""
         default_settings = {
             "rclone": {
-                "checkers": 8,
-                "transfers": 4,
+                "checkers": 16,
+                "transfers": 16,
                 "chunk_size": 64,
                 "buffer_size": 0,
                 "retries": 10,
@@ -266,8 +266,8 @@ class SettingsDialog(QDialog):
         """加载设置值到控件"""
         # Rclone 参数
         rclone = self.settings.get("rclone", {})
-        self.checkers_spin.setValue(rclone.get("checkers", 8))
-        self.transfers_spin.setValue(rclone.get("transfers", 4))
+        self.checkers_spin.setValue(rclone.get("checkers", 16))
+        self.transfers_spin.setValue(rclone.get("transfers", 16))
         self.chunk_size_spin.setValue(rclone.get("chunk_size", 64))
         self.buffer_size_spin.setValue(rclone.get("buffer_size", 0))
         self.retries_spin.setValue(rclone.get("retries", 10))
@@ -333,8 +333,8 @@ class SettingsDialog(QDialog):
         
         if reply == QMessageBox.StandardButton.Yes:
             # 恢复默认值
-            self.checkers_spin.setValue(8)
-            self.transfers_spin.setValue(4)
+            self.checkers_spin.setValue(16)
+            self.transfers_spin.setValue(16)
             self.chunk_size_spin.setValue(64)
             self.buffer_size_spin.setValue(0)
             self.retries_spin.setValue(10)
@@ -93,18 +93,21 @@ class TaskManagerDialog(QDialog):
             return False
     
     def refresh_table(self):
-        """刷新任务表格"""
-        self.task_table.setRowCount(0)
-        
-        for task in self.tasks:
-            row = self.task_table.rowCount()
-            self.task_table.insertRow(row)
+        """刷新任务表格（一次设定行数，填充期间暂停重绘）"""
+        table = self.task_table
+        table.setUpdatesEnabled(False)
+        try:
+            table.setRowCount(0)
+            table.setRowCount(len(self.tasks))
             
-            self.task_table.setItem(row, 0, QTableWidgetItem(task.get('name', '')))
-            self.task_table.setItem(row, 1, QTableWidgetItem(task.get('gdrive_folder', '')))
-            self.task_table.setItem(row, 2, QTableWidgetItem(task.get('local_folder', '')))
-            self.task_table.setItem(row, 3, QTableWidgetItem(task.get('status', '就绪')))
-            self.task_table.setItem(row, 4, QTableWidgetItem(task.get('created_at', '')))
+            for row, task in enumerate(self.tasks):
+                table.setItem(row, 0, QTableWidgetItem(task.get('name', '')))
+                table.setItem(row, 1, QTableWidgetItem(task.get('gdrive_folder', '')))
+                table.setItem(row, 2, QTableWidgetItem(task.get('local_folder', '')))
+                table.setItem(row, 3, QTableWidgetItem(task.get('status', '就绪')))
+                table.setItem(row, 4, QTableWidgetItem(task.get('created_at', '')))
+        finally:
+            table.setUpdatesEnabled(True)
     
     def add_task(self):
         """添加任务"""
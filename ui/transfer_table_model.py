@@ -0,0 +1,90 @@
+"""
+正在传输的文件列表 - 表格模型（配合 QTableView 使用）
+"""
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QBrush, QColor
+
+# 状态列颜色
+_STATUS_BRUSHES = {
+    "传输中": QBrush(QColor("#1976D2")),
+    "准备传输": QBrush(QColor("#F57C00")),
+}
+_DEFAULT_STATUS_BRUSH = QBrush(QColor("#666666"))
+
+_ALIGN_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+_ALIGN_CENTER = Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter
+
+_EMPTY_ROW = ("", "", "", "", "")
+
+
+class TransferTableModel(QAbstractTableModel):
+    """
+    固定 ROWS 行的传输列表
+    
+    每行是一个 (文件名, 大小, 进度, 速度, 状态) 元组；每次统计更新整体替换，
+    只对内容有变化的行范围发出一次 dataChanged，整张表只重绘一次。
+    """
+    
+    ROWS = 10
+    HEADERS = ("文件名", "大小", "进度", "速度", "状态")
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = [_EMPTY_ROW] * self.ROWS
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.ROWS
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[column]
+        if row is _EMPTY_ROW:
+            return None
+        if role == Qt.ItemDataRole.ToolTipRole and column == 0:
+            return row[0]  # 鼠标悬停显示全名
+        if role == Qt.ItemDataRole.ForegroundRole and column == 4:
+            return _STATUS_BRUSHES.get(row[4], _DEFAULT_STATUS_BRUSH)
+        if role == Qt.ItemDataRole.TextAlignmentRole and column > 0:
+            return _ALIGN_CENTER if column == 4 else _ALIGN_RIGHT
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    def set_transfers(self, transfers):
+        """
+        用 rclone 统计中的 transferring 列表刷新表格
+        
+        Args:
+            transfers: [{'name', 'size', 'percentage', 'speed', 'status'}, ...]，超出 ROWS 的部分不显示
+        """
+        rows = [
+            (
+                info.get('name', ''),
+                info.get('size', '-'),
+                info.get('percentage', '0%'),
+                info.get('speed', '-'),
+                info.get('status', '等待中'),
+            )
+            for info in transfers[:self.ROWS]
+        ]
+        rows.extend([_EMPTY_ROW] * (self.ROWS - len(rows)))
+        
+        changed = [i for i in range(self.ROWS) if rows[i] != self._rows[i]]
+        if not changed:
+            return
+        self._rows = rows
+        self.dataChanged.emit(
+            self.index(changed[0], 0),
+            self.index(changed[-1], len(self.HEADERS) - 1),
+        )
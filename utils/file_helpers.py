@@ -0,0 +1,28 @@
+import os
+
+def preallocate(f, size: int):
+    """
+    预分配文件大小。
+    Linux 上使用 posix_fallocate 真正预留磁盘块（减少碎片），
+    其他平台退回 truncate（仅设置大小）。
+    """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError:
+            pass  # 部分文件系统不支持，退回 truncate
+    f.truncate(size)
+
+
+def fadvise(f, advice: str):
+    """
+    向内核提示文件访问模式（仅在支持 posix_fadvise 的平台生效）。
+    advice: 'SEQUENTIAL' / 'DONTNEED' 等，对应 os.POSIX_FADV_*
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(f.fileno(), 0, 0, getattr(os, f'POSIX_FADV_{advice}'))
+    except (OSError, AttributeError):
+        pass
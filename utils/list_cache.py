@@ -0,0 +1,50 @@
+"""
+文件夹列表缓存 - 浏览时重复展开同一文件夹不再重复请求
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class DriveListCache:
+    """
+    带过期时间的 LRU 缓存（线程安全）
+
+    键一般为文件夹ID（或能唯一确定一次列表请求的参数元组），值为解析后的条目列表；
+    超过 ttl 秒的条目视为失效，超过 max_entries 个时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 120):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (写入时间, 值)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """返回缓存的值；不存在或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """使单个条目失效（如该文件夹内容已变化）"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()